@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple, Type
+from urllib.parse import parse_qs
+
+import requests
+from django.core.management.base import BaseCommand
+from sell_that_sheet.services.baselinkerclient import BaseLinkerClient
+
+
+class StubBaseLinkerHandler(BaseHTTPRequestHandler):
+    """Answers every connector call with a small successful BaseLinker response; see ``respond``."""
+    protocol_version = "HTTP/1.1"
+    connect_latency = 0.0
+    response_latency = 0.0
+
+    def setup(self):
+        # Stands in for the TCP+TLS handshake a new connection to BaseLinker costs
+        time.sleep(self.connect_latency)
+        super().setup()
+
+    def respond(self, method: str) -> Tuple[int, Dict]:
+        """HTTP status and JSON body for a call of ``method``; override to simulate failures."""
+        return 200, {"status": "SUCCESS", "method": method, "inventories": []}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        method = parse_qs(body).get("method", [""])[0]
+        time.sleep(self.response_latency)
+        status, response = self.respond(method)
+        payload = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out close the connection before the stub answers
+        pass
+
+
+def start_stub_baselinker(
+        connect_latency: float = 0.0,
+        response_latency: float = 0.0,
+        handler: Type[StubBaseLinkerHandler] = StubBaseLinkerHandler,
+):
+    """Serve ``handler`` on a free local port in a daemon thread; returns the server and its URL."""
+    handler.connect_latency = connect_latency
+    handler.response_latency = response_latency
+    server = StubServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/connector.php"
+
+
+class Command(BaseCommand):
+    help = "Compare bare requests.post against the pooled BaseLinker client on a local stub server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=200)
+        parser.add_argument("--connect-latency", type=float, default=0.05, help="Seconds added to every new connection")
+        parser.add_argument("--response-latency", type=float, default=0.0, help="Seconds added to every call")
+
+    def _run(self, function, calls):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        server, url = start_stub_baselinker(options["connect_latency"], options["response_latency"])
+
+        try:
+            calls = options["calls"]
+            payload = {"method": "getInventories", "parameters": "{}"}
+            bare_time = self._run(lambda: requests.post(url, data=payload, timeout=30).json(), calls)
+            client = BaseLinkerClient(token="stub", url=url)
+            pooled_time = self._run(lambda: client.call("getInventories"), calls)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(
+            f"{calls} calls: requests.post {bare_time:.2f}s ({bare_time / calls * 1000:.1f}ms/call), "
+            f"pooled client {pooled_time:.2f}s ({pooled_time / calls * 1000:.1f}ms/call)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"{bare_time / pooled_time if pooled_time else 0:.1f}x faster"))
@@ -0,0 +1,79 @@
+import random
+import string
+import time
+from difflib import SequenceMatcher
+
+from django.core.management.base import BaseCommand
+from sell_that_sheet.services.manufacturermatcher import MATCH_THRESHOLD, ManufacturerMatcher
+
+
+def legacy_match_manufacturer(manufacturers, name):
+    """match_manufacturer as it was before the matcher index: a SequenceMatcher per manufacturer."""
+    name = name.lower()
+    max_distance = MATCH_THRESHOLD
+    matched_id = None
+    for manufacturer in manufacturers:
+        if manufacturer['name'].lower() == name:
+            return manufacturer['manufacturer_id']
+        distance = SequenceMatcher(None, name, manufacturer['name'].lower()).ratio()
+        if distance > max_distance:
+            max_distance = distance
+            matched_id = manufacturer['manufacturer_id']
+    return matched_id
+
+
+def synthetic_name(rng):
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))).capitalize()
+        for _ in range(words)
+    )
+
+
+def misspell(rng, name):
+    position = rng.randrange(len(name))
+    return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+
+
+class Command(BaseCommand):
+    help = "Compare the manufacturer matcher index against the previous linear scan on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--manufacturers", type=int, default=3000)
+        parser.add_argument("--queries", type=int, default=300)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        manufacturers = [
+            {"manufacturer_id": i + 1, "name": synthetic_name(rng)} for i in range(options["manufacturers"])
+        ]
+        # A mix of exact names, different casing, typos and unknown manufacturers
+        queries = []
+        for _ in range(options["queries"]):
+            name = rng.choice(manufacturers)["name"]
+            queries.append(rng.choice([name, name.upper(), misspell(rng, name), synthetic_name(rng)]))
+
+        start = time.perf_counter()
+        legacy = [legacy_match_manufacturer(manufacturers, name) for name in queries]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher = ManufacturerMatcher(manufacturers)
+        build_time = time.perf_counter() - start
+        current = [matcher.match(name) for name in queries]
+        current_time = time.perf_counter() - start
+
+        mismatches = [(name, old, new) for name, old, new in zip(queries, legacy, current) if old != new]
+        for name, old, new in mismatches[:20]:
+            self.stderr.write(f"Mismatch for {name!r}: legacy {old}, current {new}")
+
+        self.stdout.write(
+            f"{len(manufacturers)} manufacturers, {len(queries)} queries: legacy {legacy_time:.2f}s, "
+            f"current {current_time:.2f}s including {build_time:.2f}s index build "
+            f"({legacy_time / current_time if current_time else 0:.1f}x)"
+        )
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f"{len(mismatches)} matches differ"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All matches identical"))
@@ -0,0 +1,77 @@
+import math
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageDraw, ImageFont
+from sell_that_sheet.services.utils import (
+    NUMERATION_FONT_SIZE,
+    chunks,
+    get_numeration_font_path,
+    merge_photos,
+    parse_photos,
+)
+
+SAMPLE_EXTENSIONS = ('.jpg', '.jpeg')
+
+
+def legacy_add_numeration_on_image(img, num):
+    """add_numeration_on_image as it was before the photo pool: font loaded and full decode per image."""
+    font = ImageFont.truetype(get_numeration_font_path(), NUMERATION_FONT_SIZE)
+    photo = Image.open(img).convert("RGB")
+
+    offset = 10
+    if num != 0:
+        draw = ImageDraw.Draw(photo)
+        draw.text((0 + offset, 0 + offset), str(num), (255, 255, 255), font=font, stroke_fill=(0, 0, 0), stroke_width=2)
+
+    return photo
+
+
+def legacy_parse_photos(image_set, max_photos=12):
+    pack_size = 4
+    numerated = [legacy_add_numeration_on_image(photo, i) for i, photo in enumerate(image_set)]
+
+    reserved = math.ceil((len(image_set) - max_photos) / (pack_size - 1))
+    to_merge = numerated[abs(max_photos - reserved):]
+    return numerated[:abs(max_photos - reserved)] + merge_photos(to_merge)
+
+
+class Command(BaseCommand):
+    help = "Compare parse_photos against the previous serial implementation on a directory of sample JPEGs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory with sample JPEGs")
+        parser.add_argument("--photos-per-auction", type=int, default=16)
+        parser.add_argument("--max-photos", type=int, default=12)
+
+    def _run(self, function, auctions, max_photos):
+        timings = []
+        for photos in auctions:
+            start = time.perf_counter()
+            function(photos, max_photos)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+        files = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(SAMPLE_EXTENSIONS)
+        )
+        if not files:
+            raise CommandError(f"No JPEGs in {directory}")
+
+        auctions = list(chunks(files, options["photos_per_auction"]))
+        legacy = self._run(legacy_parse_photos, auctions, options["max_photos"])
+        current = self._run(parse_photos, auctions, options["max_photos"])
+
+        legacy_avg = sum(legacy) / len(legacy)
+        current_avg = sum(current) / len(current)
+        self.stdout.write(
+            f"{len(files)} photos in {len(auctions)} auctions: legacy {legacy_avg:.2f}s, "
+            f"current {current_avg:.2f}s per auction (max {max(legacy):.2f}s / {max(current):.2f}s)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"{legacy_avg / current_avg if current_avg else 0:.1f}x faster"))
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from sell_that_sheet.models import Auction
+from sell_that_sheet.models.addInventoryProduct import (
+    add_side_to_tags,
+    create_dates_from_name,
+    divideString,
+    get_category_tags,
+    get_custom_tags,
+    prepare_tags,
+    remove_duplicates,
+)
+
+
+def legacy_prepare_tags(category, name, tags, language='pl'):
+    """prepare_tags as it was before the tag engine: two queries and a full scan per call."""
+    new_tags = ''
+    for ct in get_custom_tags(language):
+        if ct[0].upper() in name.upper() or ct[0].upper() in tags.upper():
+            if ct[0].upper() == 'LIFT' and ct[0].upper() in name.upper():
+                if not 'LIFT ' in name.upper() or 'PRZED LIFT' in name.upper():
+                    continue
+            new_tags = str(new_tags) + " " + str(ct[1])
+
+    category_tags = get_category_tags(int(float(category)), language)
+    if category_tags is not None:
+        new_tags += " " + " ".join(category_tags)
+
+    new_tags += " " + create_dates_from_name(name, tags)
+    new_tags += " " + add_side_to_tags(name)
+    return divideString(remove_duplicates(new_tags))
+
+
+class Command(BaseCommand):
+    help = "Compare prepare_tags against the previous implementation over the auctions table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--language", default="pl")
+        parser.add_argument("--limit", type=int, default=None, help="Only use the first N auctions")
+
+    def _run(self, function, rows, language):
+        outputs = []
+        start = time.perf_counter()
+        for category, name, tags in rows:
+            try:
+                outputs.append(function(category, name, tags, language))
+            except Exception as e:
+                outputs.append(type(e))
+        return outputs, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        rows = Auction.objects.exclude(category=None).order_by("pk").values_list("category", "name", "tags")
+        if options["limit"]:
+            rows = rows[:options["limit"]]
+        rows = list(rows)
+        language = options["language"]
+
+        legacy, legacy_time = self._run(legacy_prepare_tags, rows, language)
+        current, current_time = self._run(prepare_tags, rows, language)
+
+        mismatches = [
+            (row, old, new) for row, old, new in zip(rows, legacy, current)
+            if old != new and not (isinstance(old, type) and isinstance(new, type))
+        ]
+        for row, old, new in mismatches[:20]:
+            self.stderr.write(f"Mismatch for {row}:\n  legacy:  {old}\n  current: {new}")
+
+        self.stdout.write(
+            f"{len(rows)} auctions: legacy {legacy_time:.2f}s, current {current_time:.2f}s "
+            f"({legacy_time / current_time if current_time else 0:.1f}x)"
+        )
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f"{len(mismatches)} outputs differ"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All outputs identical"))
@@ -0,0 +1,65 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from sell_that_sheet.management.commands.benchmark_baselinker_client import start_stub_baselinker
+from sell_that_sheet.models import AddInventoryProduct
+from sell_that_sheet.services.baselinkerclient import BaseLinkerClient, RateLimiter
+from sell_that_sheet.services.baselinkerservice import BaseLinkerService, run_upload_pipeline, upload_result
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serial preparation and upload of an auction set against the upload pipeline, "
+        "with simulated preparation time and a local stub BaseLinker"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--auctions", type=int, default=50)
+        parser.add_argument(
+            "--prepare-latency", type=float, default=1.0,
+            help="Seconds spent preparing one auction (translations, photos, matching)",
+        )
+        parser.add_argument("--response-latency", type=float, default=0.3, help="Seconds per addInventoryProduct call")
+        parser.add_argument(
+            "--requests-per-minute", type=int, default=0,
+            help="Upload rate limit of the pipeline; 0 disables it (BASELINKER_REQUESTS_PER_MINUTE applies in production)",
+        )
+
+    def handle(self, *args, **options):
+        server, url = start_stub_baselinker(response_latency=options["response_latency"])
+        service = BaseLinkerService()
+        service.client = BaseLinkerClient(token="stub", url=url)
+        limiter = RateLimiter(options["requests_per_minute"])
+        auctions = [SimpleNamespace(id=i) for i in range(1, options["auctions"] + 1)]
+
+        def prepare(auction):
+            time.sleep(options["prepare_latency"])
+            return AddInventoryProduct(inventory_id="1", sku=f"stub-{auction.id}")
+
+        def upload(product):
+            limiter.wait()
+            return service.upload_product(product)
+
+        try:
+            start = time.perf_counter()
+            serial = [upload_result(auction.id, service.upload_product(prepare(auction))) for auction in auctions]
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            pipelined = run_upload_pipeline(auctions, prepare, upload)
+            pipeline_time = time.perf_counter() - start
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        failed = [r for r in serial + pipelined if r.status != "SUCCESS"]
+        count = len(auctions)
+        self.stdout.write(
+            f"{count} auctions: serial {serial_time:.2f}s ({count / serial_time:.1f}/s), "
+            f"pipeline {pipeline_time:.2f}s ({count / pipeline_time:.1f}/s)"
+        )
+        if failed:
+            self.stderr.write(self.style.ERROR(f"{len(failed)} uploads failed: {failed[:5]}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{serial_time / pipeline_time:.1f}x faster"))
@@ -1,19 +1,19 @@
 from django.core.management.base import BaseCommand
 from sell_that_sheet.services.allegroconnector import AllegroConnector
+from sell_that_sheet.services.allegrocatalogue import export_catalogue
 
 class Command(BaseCommand):
     help = 'Export all auctions with parameters from allegro to an XLSX file'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Run a full sync downloading every offer again instead of applying the changes since the last sync",
+        )
+
+    def handle(self, *args, **options):
         connector = AllegroConnector()
         connector.get_allegro_access_token()
-        catalogue = connector.download_catalogue()
-
-        parsed = connector.parse_catalogue(catalogue)
-
-        # save parsed to json file
-        with open('parsed_catalogue.json', 'w') as f:
-            import json
-            json.dump(parsed, f, indent=4)
 
-        connector.export_to_xlsx(parsed, 'full_catalogue.xlsx')
+        # parsed offers are also saved to a json file
+        export_catalogue(connector, 'full_catalogue.xlsx', json_path='parsed_catalogue.json', full=options["full"])
@@ -1,24 +1,76 @@
+import datetime
+
 import pandas as pd
+from pandas.api.types import is_bool, is_float, is_integer
 from django.core.management.base import BaseCommand
+from openpyxl import Workbook
 from sell_that_sheet.models import Auction, AuctionParameter
 from sell_that_sheet.models.addInventoryProduct import divideString, remove_duplicates, prepare_tags
-from django.db.models import Prefetch
-from django.utils.timezone import is_aware
+
+AUCTION_FIELDS = [
+    "id", "name", "photoset__thumbnail__name", "price_pln", "price_euro", "tags", "serial_numbers",
+    "photoset_id", "shipment_price", "description", "category",
+    "created_at", "amount", "translated_params",
+]
+
+
+def cell_value(value):
+    """Convert a value the way pandas' to_excel did: missing values empty, unknown types (Decimal, JSON) as text."""
+    if isinstance(value, (dict, list)):
+        return str(value)
+    if value is None or pd.isna(value):
+        return None
+    if is_bool(value):
+        return bool(value)
+    if is_integer(value):
+        return int(value)
+    if is_float(value):
+        return float(value)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, (str, datetime.date, datetime.timedelta)):
+        return value
+    return str(value)
+
 
 class Command(BaseCommand):
     help = 'Export all auctions with parameters to an XLSX file'
 
-    def handle(self, *args, **kwargs):
-        auctions = Auction.objects.prefetch_related(
-            Prefetch('auctionparameter_set', queryset=AuctionParameter.objects.select_related('parameter'))
-        ).all()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=5000, help="Auctions loaded and written per batch"
+        )
 
-        param_names = set()
-        for auction in auctions:
-            for ap in auction.auctionparameter_set.all():
-                param_names.add(ap.parameter.name)
+    def _chunks(self, chunk_size):
+        last_pk = 0
+        while True:
+            chunk = list(
+                Auction.objects.filter(pk__gt=last_pk).order_by("pk").values_list(*AUCTION_FIELDS)[:chunk_size]
+            )
+            if not chunk:
+                return
+            last_pk = chunk[-1][0]
+            yield pd.DataFrame.from_records(chunk, columns=AUCTION_FIELDS)
 
-        param_names = sorted(param_names)
+    def _parameter_columns(self, auction_ids, param_names):
+        params = pd.DataFrame.from_records(
+            list(
+                AuctionParameter.objects.filter(auction_id__in=auction_ids)
+                .order_by("pk")
+                .values_list("auction_id", "parameter__name", "value_name")
+            ),
+            columns=["auction_id", "name", "value"],
+        )
+        # A repeated parameter keeps its last value, like the per-auction dict did
+        params = params.drop_duplicates(["auction_id", "name"], keep="last")
+        return params.pivot(index="auction_id", columns="name", values="value").reindex(
+            index=auction_ids, columns=param_names
+        )
+
+    def handle(self, *args, **options):
+        param_names = sorted(
+            AuctionParameter.objects.values_list("parameter__name", flat=True).distinct()
+        )
 
         static_fields = [
             "id", "name", "thumbnail name", "price_pln", "price_euro", "tags", "serial_numbers",
@@ -30,51 +82,34 @@ class Command(BaseCommand):
         ]
         headers = static_fields + param_names
 
-        rows = []
-        for auction in auctions:
-            # Safely convert to timezone-naive
-            created_at = auction.created_at
-            if is_aware(created_at):
-                created_at = created_at.replace(tzinfo=None)
-
-
-
-            thumbnail_img_name  = auction.photoset.thumbnail.name.split('.')[0]
-
-            row = [
-                auction.id,
-                auction.name,
-                thumbnail_img_name,
-                auction.price_pln,
-                auction.price_euro,
-                auction.tags,
-                auction.serial_numbers,
-                auction.photoset_id,
-                auction.shipment_price,
-                auction.description,
-                auction.category,
-                created_at,
-                auction.amount,
-                auction.translated_params,
-                auction.serial_numbers,
-                divideString(remove_duplicates(auction.tags).upper()),
-                prepare_tags(
-                    auction.category, auction.name, auction.tags
-                )
-            ]
+        # Write-only workbooks stream rows to disk, so memory is bounded by one chunk
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Sheet1")
+        ws.append(headers)
 
-            param_map = {ap.parameter.name: ap.value_name for ap in auction.auctionparameter_set.all()}
-            for pname in param_names:
-                row.append(param_map.get(pname))
-            rows.append(row)
+        exported = 0
+        for auctions in self._chunks(options["chunk_size"]):
+            auctions["photoset__thumbnail__name"] = auctions["photoset__thumbnail__name"].str.split(".").str[0]
+            # Timezone-naive, as Excel cannot store offsets
+            auctions["created_at"] = pd.to_datetime(auctions["created_at"], utc=True).dt.tz_localize(None)
+            auctions["Numer katalogowy części"] = auctions["serial_numbers"]
+            auctions["Numer katalogowy oryginału"] = [
+                divideString(remove_duplicates(tags).upper()) for tags in auctions["tags"]
+            ]
+            # prepare_tags goes through the cached tag engine, so this no longer queries per row
+            auctions["Numery katalogowe zamienników"] = [
+                prepare_tags(category, name, tags)
+                for category, name, tags in zip(auctions["category"], auctions["name"], auctions["tags"])
+            ]
 
-        df = pd.DataFrame(rows, columns=headers)
+            parameters = self._parameter_columns(auctions["id"].tolist(), param_names)
+            for static_row, param_row in zip(auctions.itertuples(index=False), parameters.itertuples(index=False)):
+                ws.append([cell_value(value) for value in static_row] + [cell_value(value) for value in param_row])
 
-        # Explicit conversion of datetime columns to timezone-naive
-        if 'created_at' in df.columns:
-            df['created_at'] = pd.to_datetime(df['created_at']).dt.tz_localize(None)
+            exported += len(auctions)
+            self.stdout.write(f"Exported {exported} auctions")
 
         output_path = 'auctions_export.xlsx'
-        df.to_excel(output_path, index=False)
+        wb.save(output_path)
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully exported auctions to {output_path}'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'Successfully exported auctions to {output_path}'))
@@ -0,0 +1,27 @@
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sell_that_sheet.services.photocache import prune_photo_cache
+
+
+class Command(BaseCommand):
+    help = "Evict least recently used entries from the processed listing photo cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-bytes", type=int, default=None,
+            help="Target cache size in bytes (defaults to PHOTO_CACHE_MAX_BYTES)"
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Remove the whole cache"
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            shutil.rmtree(settings.PHOTO_CACHE_DIR, ignore_errors=True)
+            self.stdout.write(self.style.SUCCESS(f"Cleared {settings.PHOTO_CACHE_DIR}"))
+            return
+
+        removed = prune_photo_cache(options["max_bytes"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached photosets"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from sell_that_sheet.services.baselinkerservice import BASELINKER_TO_ALLEGRO_CATEGORY_ID
+from sell_that_sheet.services.categorypathresolver import category_path_resolver
+
+
+class Command(BaseCommand):
+    help = "Preload Allegro category paths for all categories mapped in BASELINKER_TO_ALLEGRO_CATEGORY_ID"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh", action="store_true", help="Drop stored paths and resolve everything again"
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"]:
+            category_path_resolver.invalidate()
+
+        category_ids = sorted(set(BASELINKER_TO_ALLEGRO_CATEGORY_ID.values()))
+        failed = 0
+        for category_id in category_ids:
+            try:
+                category_path_resolver.resolve(category_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Failed to resolve category {category_id}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Resolved {len(category_ids) - failed} of {len(category_ids)} category paths")
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0003_auctionparametertranslation_parametertranslation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AllegroCategoryPath",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("category_id", models.CharField(max_length=32, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "parent_id",
+                    models.CharField(blank=True, max_length=32, null=True),
+                ),
+                ("path", models.TextField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0005_openaitranslationcache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AllegroOffer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("offer_id", models.CharField(max_length=32, unique=True)),
+                (
+                    "updated_at",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("details", models.JSONField()),
+                ("fetched_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0006_allegrooffer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="allegrooffer",
+            name="parsed",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="allegrooffer",
+            name="active",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name="AllegroCatalogueSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_event_id",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("synced_at", models.DateTimeField(blank=True, null=True)),
+                ("full_synced_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
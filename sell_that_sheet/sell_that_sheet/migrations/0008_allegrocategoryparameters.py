@@ -0,0 +1,34 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0007_allegrooffer_parsed_active_allegrocataloguesync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AllegroCategoryParameters",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("category_id", models.CharField(max_length=32, unique=True)),
+                ("response", models.JSONField()),
+                (
+                    "etag",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("fetched_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_parameters(apps, schema_editor):
+    """
+    Merge Allegro parameters (custom ids are left alone) registered more than once, so
+    unique_allegro_parameter_id can be added. Only rows with the same allegro_id, name and type
+    are merged: the oldest one is kept and the auction parameters and translations of the others
+    are moved onto it. Rows sharing an id under a different name or type are not guessed at -
+    the migration stops and lists them to be fixed by hand.
+    """
+    Parameter = apps.get_model("sell_that_sheet", "Parameter")
+    AuctionParameter = apps.get_model("sell_that_sheet", "AuctionParameter")
+    ParameterTranslation = apps.get_model("sell_that_sheet", "ParameterTranslation")
+
+    allegro_parameters = Parameter.objects.exclude(allegro_id__contains="custom")
+    duplicated_ids = list(
+        allegro_parameters.values("allegro_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("allegro_id", flat=True)
+    )
+
+    groups = defaultdict(list)
+    for pk, allegro_id, name, type_ in (
+        allegro_parameters.filter(allegro_id__in=duplicated_ids)
+        .order_by("pk")
+        .values_list("pk", "allegro_id", "name", "type")
+    ):
+        groups[allegro_id].append((pk, name, type_))
+
+    conflicts = {
+        allegro_id: rows for allegro_id, rows in groups.items()
+        if len({(name, type_) for _, name, type_ in rows}) > 1
+    }
+    if conflicts:
+        listing = "\n".join(
+            f"  allegro_id={allegro_id!r}: "
+            + ", ".join(f"#{pk} {name!r} ({type_})" for pk, name, type_ in rows)
+            for allegro_id, rows in sorted(conflicts.items())
+        )
+        raise RuntimeError(
+            "Parameters sharing an Allegro id differ in name or type and cannot be merged "
+            f"automatically. Fix or delete them, then migrate again:\n{listing}"
+        )
+
+    for rows in groups.values():
+        keep = rows[0][0]
+        duplicates = [pk for pk, _, _ in rows[1:]]
+        AuctionParameter.objects.filter(parameter_id__in=duplicates).update(parameter_id=keep)
+        ParameterTranslation.objects.filter(parameter_id__in=duplicates).update(parameter_id=keep)
+        Parameter.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0008_allegrocategoryparameters"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_parameters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sell_that_sheet", "0009_merge_duplicate_parameters"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="parameter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("allegro_id__contains", "custom"), _negated=True),
+                fields=("allegro_id",),
+                name="unique_allegro_parameter_id",
+            ),
+        ),
+    ]
@@ -5,10 +5,14 @@ from .auction import Auction
 from .auctionset import AuctionSet
 from .parameter import Parameter, AuctionParameter
 from .allegroAuthToken import AllegroAuthToken
-from .addInventoryProduct import AddInventoryProduct, AddInventoryProductResponse
+from .addInventoryProduct import AddInventoryProduct, AddInventoryProductResponse, AuctionUploadResult
 from .decription_template import DescriptionTemplate
 from .keyword_translation import KeywordTranslation
 from .translations import ParameterTranslation, AuctionParameterTranslation
 from .translation_example import TranslationExample
 from .tag import Tag
 from .category_tag import CategoryTag
+from .allegro_category_path import AllegroCategoryPath
+from .openai_translation_cache import OpenAiTranslationCache
+from .allegro_offer import AllegroOffer, AllegroCatalogueSync
+from .allegro_category_parameters import AllegroCategoryParameters
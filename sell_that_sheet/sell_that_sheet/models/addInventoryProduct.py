@@ -13,10 +13,11 @@ from django.conf import settings
 
 from ..models.category_tag import CategoryTag
 from ..models.tag import Tag
-from ..services.feature_translation_service import translate_features_dict, translate_name_description
+from ..services.feature_translation_service import TranslationRequest, translate_features_dict, translate_name_description
 
 from ..services.openaiservice import OpenAiService
-from ..services.utils import parse_photos, limit_photo_size
+from ..services.photocache import get_listing_photos
+from ..services.tagengine import get_tag_engine
 from pydantic import BaseModel
 import sqlite3
 import re
@@ -164,18 +165,15 @@ def divideString(string, max_size=40, sep="|"):
 def prepare_tags(category, name, tags, language='pl'):
     new_tags = ''
     try:
-        for ct in get_custom_tags(language):
-            if ct[0].upper() in name.upper() or ct[0].upper() in tags.upper():
-                if ct[0].upper() == 'LIFT' and ct[0].upper() in name.upper():
-                    if not 'LIFT ' in name.upper() or 'PRZED LIFT' in name.upper():
-                        continue
-                new_tags = str(new_tags) + " " + str(ct[1])
+        tag_engine = get_tag_engine(language)
+        for value in tag_engine.match_custom_tags(name, tags):
+            new_tags = str(new_tags) + " " + value
     except Exception as e:
         raise Exception("Nie udało się dodać własnych tagów\n" + str(e)) from e
         print("Nie udało się dodać własnych tagów", e)
 
     try:
-        category_tags = get_category_tags(int(float(category)), language)
+        category_tags = tag_engine.get_category_tags(int(float(category)))
         if category_tags is not None:
             new_tags += " " + " ".join(category_tags)
     except Exception as e:
@@ -221,6 +219,31 @@ class AddInventoryProduct(BaseModel):
     bundle_products: Optional[Dict[str, int]] = None
 
 
+    @classmethod
+    def translation_requests(cls, auctions) -> List[TranslationRequest]:
+        """
+        What from_auction will translate for each auction, for prefetch_translations.
+        Name/description are left out when the auction already carries both German texts.
+        """
+        parameters_by_auction = defaultdict(list)
+        for param in AuctionParameter.objects.filter(auction__in=auctions).select_related("parameter"):
+            if "custom" not in param.parameter.allegro_id:
+                parameters_by_auction[param.auction_id].append(param)
+
+        requests = []
+        for auction in auctions:
+            translated = (auction.translated_params or {}).get("de", {})
+            needs_text = not translated.get("name") or not translated.get("description")
+            parameters = parameters_by_auction[auction.id]
+            requests.append(TranslationRequest(
+                name=auction.name if needs_text else None,
+                description=auction.description or "",
+                category_id=auction.category,
+                features={param.parameter.name: param.value_name for param in parameters},
+                auction_parameters=parameters,
+            ))
+        return requests
+
     @classmethod
     def from_auction(cls, inventory_id, auction, match_manufacturer, match_category, owner, author):
         """
@@ -259,8 +282,7 @@ class AddInventoryProduct(BaseModel):
         # add thumbnail to the first position
         photos.insert(0, os.path.join(settings.MEDIA_ROOT, photoset.directory_location, thumbnail.name))
 
-        photos = parse_photos(photos, settings.PHOTOSET_MAX_PHOTOS)
-        photos = limit_photo_size(photos)
+        photos = get_listing_photos(photos, settings.PHOTOSET_MAX_PHOTOS)
         photos = {i: photo for i, photo in enumerate(photos)}
         # Add parameters (features) from AuctionParameter
         parameters = AuctionParameter.objects.filter(auction=auction)
@@ -342,6 +364,7 @@ class AddInventoryProductResponse(BaseModel):
     status: str  # "SUCCESS" or "ERROR"
     product_id: Optional[Union[str, int]] = None  # The ID of the newly added product in BaseLinker
     warnings: Optional[Dict[str, str]] = None  # Any warnings related to the product addition
+    error_message: Optional[str] = None  # Reason given by BaseLinker when status is "ERROR"
 
     @classmethod
     def from_response(cls, response: Dict):
@@ -352,6 +375,7 @@ class AddInventoryProductResponse(BaseModel):
             status=response.get("status"),
             product_id=response.get("product_id"),
             warnings=response.get("warnings"),
+            error_message=response.get("error_message"),
         )
 
     class Config:
@@ -363,4 +387,12 @@ class AddInventoryProductResponse(BaseModel):
                     "image_error": "Image at index 1 could not be processed"
                 }
             }
-        }
\ No newline at end of file
+        }
+
+
+class AuctionUploadResult(BaseModel):
+    auction_id: int
+    status: str  # "SUCCESS" or "ERROR"
+    product_id: Optional[Union[str, int]] = None
+    warnings: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
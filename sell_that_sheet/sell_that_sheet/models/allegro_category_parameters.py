@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class AllegroCategoryParameters(models.Model):
+    """
+    Last /sale/categories/{id}/parameters response for a category, with the ETag Allegro sent,
+    so stale entries are revalidated with a conditional request instead of downloaded again.
+    """
+    category_id = models.CharField(max_length=32, unique=True)
+    response = models.JSONField()
+    etag = models.CharField(max_length=255, null=True, blank=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Parameters of category {self.category_id}"
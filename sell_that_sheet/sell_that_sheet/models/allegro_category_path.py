@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class AllegroCategoryPath(models.Model):
+    """
+    Resolved Allegro category with its full "A/B/C" path, used to avoid walking the
+    category tree through the Allegro API for every auction.
+    """
+    category_id = models.CharField(max_length=32, unique=True)
+    name = models.CharField(max_length=255)
+    parent_id = models.CharField(max_length=32, null=True, blank=True)
+    path = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.category_id}: {self.path}"
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class AllegroOffer(models.Model):
+    """
+    Local mirror of one Allegro offer: its product-offer details and the parsed catalogue row.
+    Catalogue exports persist every offer here as soon as it arrives, so an interrupted export
+    resumes instead of starting over, and later syncs only refresh offers that changed.
+    """
+    offer_id = models.CharField(max_length=32, unique=True)
+    # Modification time reported by Allegro ("updatedAt"), kept verbatim for comparison
+    updated_at = models.CharField(max_length=64, null=True, blank=True)
+    details = models.JSONField()
+    parsed = models.JSONField(null=True, blank=True)
+    active = models.BooleanField(default=True)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.offer_id} ({self.updated_at})"
+
+
+class AllegroCatalogueSync(models.Model):
+    """Single row remembering where the last catalogue sync stopped in Allegro's offer event feed."""
+    last_event_id = models.CharField(max_length=64, null=True, blank=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+    full_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Catalogue sync at {self.synced_at} (event {self.last_event_id})"
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class OpenAiTranslationCache(models.Model):
+    """
+    Stored OpenAI translation response. ``cache_key`` hashes the model, the rendered
+    instructions (which include the dictionary and examples) and the normalized input.
+    """
+    KIND_CHOICES = [('completion', 'Title/description'), ('parameter', 'Parameter pair')]
+
+    cache_key = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    model = models.CharField(max_length=100)
+    request = models.TextField()
+    response = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"[{self.kind}] {self.request[:50]}"
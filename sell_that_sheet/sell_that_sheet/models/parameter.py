@@ -7,6 +7,16 @@ class Parameter(models.Model):
     name = models.CharField(max_length=255, verbose_name="Parameter name")
     type = models.CharField(max_length=255, verbose_name="Parameter type")
 
+    class Meta:
+        constraints = [
+            # Parameters registered from Allegro exist once; custom ones created through the API may repeat
+            models.UniqueConstraint(
+                fields=["allegro_id"],
+                condition=~models.Q(allegro_id__contains="custom"),
+                name="unique_allegro_parameter_id",
+            ),
+        ]
+
 
 class AuctionParameter(models.Model):
     parameter = models.ForeignKey(Parameter, on_delete=models.CASCADE, verbose_name="Associated Parameter")
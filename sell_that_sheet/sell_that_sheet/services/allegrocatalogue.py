@@ -0,0 +1,217 @@
+import logging
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Set
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models.allegro_offer import AllegroOffer, AllegroCatalogueSync
+from .allegroconnector import AllegroConnector
+from .tabularexport import tee_to_json
+
+logger = logging.getLogger(__name__)
+
+# Offer events after which the stored details are downloaded again, and those ending an offer
+REFRESH_EVENT_TYPES = {
+    "OFFER_ACTIVATED", "OFFER_CHANGED", "OFFER_STOCK_CHANGED", "OFFER_PRICE_CHANGED",
+    "OFFER_TRANSLATION_UPDATED", "OFFER_VISIBILITY_CHANGED",
+}
+END_EVENT_TYPES = {"OFFER_ENDED", "OFFER_ARCHIVED"}
+
+ID_CHUNK = 1000
+
+
+def modification_marker(offer: Dict) -> Optional[str]:
+    return offer.get("updatedAt")
+
+
+def is_active(details: Dict) -> bool:
+    return (details.get("publication") or {}).get("status", "ACTIVE") == "ACTIVE"
+
+
+def _upsert_options() -> Dict:
+    options = {
+        "update_conflicts": True,
+        "update_fields": ["updated_at", "details", "parsed", "active", "fetched_at"],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE cannot name the conflicting column; offer_id is the only unique one
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = ["offer_id"]
+    return options
+
+
+def _store(connector: AllegroConnector, details: List[Dict]):
+    now = timezone.now()
+    AllegroOffer.objects.bulk_create(
+        [
+            AllegroOffer(
+                offer_id=d["id"], updated_at=modification_marker(d), details=d,
+                parsed=connector.parse_offer(d), active=is_active(d), fetched_at=now,
+            )
+            for d in details
+        ],
+        **_upsert_options(),
+    )
+
+
+def offers_to_download(offers: List[Dict], full: bool = False) -> List[Dict]:
+    """
+    Listed offers whose stored details cannot be reused. Stored details are reused when Allegro
+    reports the same modification time, or - when the listing carries none - when they were
+    fetched less than ALLEGRO_CATALOGUE_CHECKPOINT_MAX_AGE seconds ago, which is what lets a
+    failed export resume where it stopped.
+    """
+    if full:
+        return offers
+
+    stored = {}
+    ids = [o["id"] for o in offers]
+    for start in range(0, len(ids), ID_CHUNK):
+        stored.update({
+            offer_id: (updated_at, fetched_at)
+            for offer_id, updated_at, fetched_at in AllegroOffer.objects.filter(
+                offer_id__in=ids[start:start + ID_CHUNK]
+            ).values_list("offer_id", "updated_at", "fetched_at")
+        })
+
+    fresh_after = timezone.now() - timedelta(seconds=settings.ALLEGRO_CATALOGUE_CHECKPOINT_MAX_AGE)
+    missing = []
+    for offer in offers:
+        if offer["id"] in stored:
+            updated_at, fetched_at = stored[offer["id"]]
+            marker = modification_marker(offer)
+            if marker is not None and marker == updated_at:
+                continue
+            if marker is None and fetched_at >= fresh_after:
+                continue
+        missing.append(offer)
+    return missing
+
+
+def download_offers(connector: AllegroConnector, offers: List[Dict], failed: Optional[List[str]] = None) -> int:
+    """Download and store the details of ``offers``, checkpointing every ALLEGRO_CATALOGUE_FLUSH_SIZE offers."""
+    batch, stored = [], 0
+    for details in connector.iter_offer_details(offers, failed):
+        batch.append(details)
+        if len(batch) >= settings.ALLEGRO_CATALOGUE_FLUSH_SIZE:
+            _store(connector, batch)
+            stored += len(batch)
+            batch = []
+    if batch:
+        _store(connector, batch)
+        stored += len(batch)
+    return stored
+
+
+def _set_active(offer_ids: List[str]):
+    """Mark exactly ``offer_ids`` as the active offers."""
+    with transaction.atomic():
+        AllegroOffer.objects.filter(active=True).update(active=False)
+        for start in range(0, len(offer_ids), ID_CHUNK):
+            AllegroOffer.objects.filter(offer_id__in=offer_ids[start:start + ID_CHUNK]).update(active=True)
+
+
+def _latest_event_id(connector: AllegroConnector, from_event_id: Optional[str] = None) -> Optional[str]:
+    last_id = from_event_id
+    for event in connector.iter_offer_events(from_event_id):
+        last_id = event["id"]
+    return last_id
+
+
+def full_sync(connector: AllegroConnector, state: AllegroCatalogueSync, full: bool = False) -> Dict:
+    """List every active offer and download the ones the mirror cannot reuse."""
+    # Taken before listing, so changes made while the sync runs are picked up by the next one
+    last_event_id = _latest_event_id(connector)
+
+    offers = connector.fetch_all_offers()
+    missing = offers_to_download(offers, full)
+    logger.info(f"Full catalogue sync: {len(offers)} offers, {len(offers) - len(missing)} reused, {len(missing)} to download")
+
+    failed: List[str] = []
+    downloaded = download_offers(connector, missing, failed)
+    _set_active([o["id"] for o in offers])
+
+    state.last_event_id = last_event_id
+    state.synced_at = state.full_synced_at = timezone.now()
+    state.save()
+    return {"mode": "full", "offers": len(offers), "downloaded": downloaded, "failed": failed}
+
+
+def incremental_sync(connector: AllegroConnector, state: AllegroCatalogueSync) -> Dict:
+    """Apply the offer events since the last sync: refresh changed offers, deactivate ended ones."""
+    changed: Set[str] = set()
+    ended: Set[str] = set()
+    last_event_id = state.last_event_id
+    for event in connector.iter_offer_events(state.last_event_id):
+        offer_id = event.get("offer", {}).get("id")
+        last_event_id = event["id"]
+        if not offer_id:
+            continue
+        if event.get("type") in END_EVENT_TYPES:
+            ended.add(offer_id)
+            changed.discard(offer_id)
+        elif event.get("type") in REFRESH_EVENT_TYPES:
+            changed.add(offer_id)
+            ended.discard(offer_id)
+    logger.info(f"Incremental catalogue sync: {len(changed)} changed, {len(ended)} ended offers")
+
+    failed: List[str] = []
+    downloaded = download_offers(connector, [{"id": offer_id} for offer_id in sorted(changed)], failed)
+    ended = sorted(ended)
+    for start in range(0, len(ended), ID_CHUNK):
+        AllegroOffer.objects.filter(offer_id__in=ended[start:start + ID_CHUNK]).update(active=False)
+
+    # Failed offers are retried by the next sync
+    if not failed:
+        state.last_event_id = last_event_id
+    state.synced_at = timezone.now()
+    state.save()
+    return {"mode": "incremental", "changed": len(changed), "ended": len(ended), "downloaded": downloaded, "failed": failed}
+
+
+def sync_catalogue(connector: AllegroConnector, full: bool = False) -> Dict:
+    """
+    Bring the AllegroOffer mirror up to date. After a first full sync only offers reported by
+    Allegro's offer event feed are downloaded; a full sync runs again when requested, when
+    ALLEGRO_CATALOGUE_FULL_SYNC_INTERVAL has passed, or when the feed no longer reaches back
+    to the last processed event.
+    """
+    state = AllegroCatalogueSync.objects.first() or AllegroCatalogueSync()
+    due = (
+        state.full_synced_at is None
+        or timezone.now() - state.full_synced_at > timedelta(seconds=settings.ALLEGRO_CATALOGUE_FULL_SYNC_INTERVAL)
+    )
+    if full or due:
+        return full_sync(connector, state, full)
+
+    try:
+        return incremental_sync(connector, state)
+    except Exception as e:
+        logger.warning(f"Incremental catalogue sync failed, running a full sync: {e}")
+        return full_sync(connector, state)
+
+
+def iter_mirrored_rows(connector: AllegroConnector) -> Iterator[Dict]:
+    """Parsed catalogue rows of the active offers, straight from the mirror."""
+    rows = AllegroOffer.objects.filter(active=True).order_by("pk").values_list("parsed", "details")
+    for parsed, details in rows.iterator(chunk_size=ID_CHUNK):
+        yield parsed if parsed is not None else connector.parse_offer(details)
+
+
+def export_catalogue(
+        connector: AllegroConnector,
+        output_path: str,
+        json_path: Optional[str] = None,
+        full: bool = False,
+) -> str:
+    """Sync the offer mirror and regenerate the catalogue workbook from it."""
+    stats = sync_catalogue(connector, full)
+    if stats["failed"]:
+        logger.warning(f"{len(stats['failed'])} offers could not be downloaded: {stats['failed']}")
+
+    rows = iter_mirrored_rows(connector)
+    if json_path:
+        rows = tee_to_json(rows, json_path)
+    connector.export_to_xlsx(rows, output_path)
+    return output_path
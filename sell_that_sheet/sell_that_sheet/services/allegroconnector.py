@@ -3,13 +3,22 @@ from django.conf import settings
 import requests
 import os
 import json
-from ..models import AllegroAuthToken
 from django.utils import timezone
-from datetime import timedelta
-from openpyxl import Workbook
 from tqdm import tqdm
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-import csv
+from typing import Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+import logging
+import threading
+import time
+
+from django.db import connection
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .allegrotoken import allegro_token_manager
+from .tabularexport import write_csv, write_xlsx
 
 CLIENT_ID = settings.ALLEGRO_CLIENT_ID
 CLIENT_SECRET = settings.ALLEGRO_CLIENT_SECRET
@@ -19,6 +28,86 @@ TOKEN_URL = settings.ALLEGRO_TOKEN_URL
 SCOPES = settings.ALLEGRO_SCOPES
 STATE = settings.ALLEGRO_STATE
 
+logger = logging.getLogger(__name__)
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+
+
+class AllegroRateLimitError(requests.exceptions.HTTPError):
+    """Raised on HTTP 429; ``retry_after`` is how many seconds Allegro asked us to wait."""
+
+    def __init__(self, retry_after: float, response=None):
+        super().__init__(f"Allegro rate limit hit, retry after {retry_after:.0f}s", response=response)
+        self.retry_after = retry_after
+
+
+class RetryAfterGate:
+    """Holds back every thread of the process until a Retry-After delay has passed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self):
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limit_gate = RetryAfterGate()
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Retry-After is either a number of seconds or an HTTP date."""
+    if not value:
+        return settings.ALLEGRO_RATE_LIMIT_BACKOFF
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max((parsedate_to_datetime(value) - timezone.now()).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return settings.ALLEGRO_RATE_LIMIT_BACKOFF
+
+
+def _build_session() -> requests.Session:
+    # 429 is left to _authenticated_get so every worker backs off together
+    transport_retry = Retry(
+        total=settings.ALLEGRO_MAX_RETRIES,
+        connect=settings.ALLEGRO_MAX_RETRIES,
+        status=settings.ALLEGRO_MAX_RETRIES,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        backoff_factor=1,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.ALLEGRO_POOL_SIZE,
+        max_retries=transport_retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Per-process keep-alive session shared by all Allegro API calls, recreated after a fork."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
 
 class AllegroConnector:
     BASE_URL = "https://api.allegro.pl"
@@ -44,19 +133,8 @@ class AllegroConnector:
         return new_token
 
     def get_allegro_access_token(self):
-        # Get the allegro auth token from the database
-        token = AllegroAuthToken.objects.first()
-        if token:
-            # Check if the token is expired
-            if token.expires_at < timezone.now():
-                # Refresh the token
-                new_token = self.refresh_token(token.refresh_token)
-                token.access_token = new_token['access_token']
-                token.refresh_token = new_token['refresh_token']
-                token.expires_at = timezone.now() + timedelta(seconds=new_token['expires_in'])
-                token.save()
-            return token.access_token
-        return None
+        # Served from memory; the database is only read when the token is close to expiring
+        return allegro_token_manager.get_access_token(self.refresh_token)
 
     def get_category_tree(self, cat_id):
         # Base URL for the API endpoint
@@ -83,15 +161,41 @@ class AllegroConnector:
         wait=wait_exponential(multiplier=1, max=10),
         retry=retry_if_exception_type((requests.exceptions.RequestException,))
     )
-    def make_authenticated_get_request(self, request, url, params=None):
+    def _authenticated_get(self, url, params=None, extra_headers=None) -> requests.Response:
         access_token = self.get_allegro_access_token()
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Accept': 'application/vnd.allegro.public.v1+json'
         }
-        r = requests.get(url, headers=headers, params=params, timeout=10)
+        headers.update(extra_headers or {})
+        rate_limit_gate.wait()
+        r = get_session().get(
+            url, headers=headers, params=params,
+            timeout=(settings.ALLEGRO_CONNECT_TIMEOUT, settings.ALLEGRO_READ_TIMEOUT),
+        )
+        if r.status_code == 401:
+            # Revoked or replaced token - drop the cached one so the retry reloads it
+            allegro_token_manager.invalidate()
+        if r.status_code == 429:
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            logger.warning(f"Allegro rate limit hit on {url}, pausing requests for {retry_after:.0f}s")
+            rate_limit_gate.pause(retry_after)
+            raise AllegroRateLimitError(retry_after, response=r)
         r.raise_for_status()
-        return r.json()
+        return r
+
+    def make_authenticated_get_request(self, request, url, params=None):
+        return self._authenticated_get(url, params).json()
+
+    def make_conditional_get_request(self, url, etag: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        GET ``url`` revalidating a previously received ``etag``.
+        Returns ``(None, etag)`` when Allegro answers 304 Not Modified, else the body and its new ETag.
+        """
+        r = self._authenticated_get(url, extra_headers={'If-None-Match': etag} if etag else None)
+        if r.status_code == 304:
+            return None, etag
+        return r.json(), r.headers.get('ETag')
 
     def fetch_all_offers(self, limit: int = 100) -> list:
         offers = []
@@ -116,13 +220,66 @@ class AllegroConnector:
             f"{self.BASE_URL}/sale/product-offers/{offer_id}"
         )
 
+    def iter_offer_events(self, from_event_id: Optional[str] = None, limit: int = 1000) -> Iterator[dict]:
+        """
+        Page through the seller's offer events (changes, activations, endings) after
+        ``from_event_id``, oldest first. Allegro keeps events for a limited time only.
+        """
+        while True:
+            params = {"limit": limit}
+            if from_event_id:
+                params["from"] = from_event_id
+            resp = self.make_authenticated_get_request(None, f"{self.BASE_URL}/sale/offer-events", params=params)
+            events = resp.get("offerEvents", [])
+            yield from events
+            if len(events) < limit:
+                return
+            from_event_id = events[-1]["id"]
+
+    def _fetch_offer_details_in_thread(self, offer_id: str) -> dict:
+        try:
+            return self.fetch_offer_details(offer_id)
+        finally:
+            # Worker threads get their own DB connection (token lookup), don't leak it
+            connection.close()
+
+    def iter_offer_details(self, offers: List[dict], failed: Optional[List[str]] = None) -> Iterator[dict]:
+        """
+        Download the details of ``offers`` on ALLEGRO_DOWNLOAD_WORKERS threads and yield them as
+        they arrive (not in input order). Each request is retried on its own; an offer that still
+        fails is logged, added to ``failed`` and skipped instead of aborting the download.
+        """
+        offer_ids = iter([o['id'] for o in offers])
+        # Only a few requests per worker are queued, so results are never piled up in memory
+        window = settings.ALLEGRO_DOWNLOAD_WORKERS * 4
+        with ThreadPoolExecutor(max_workers=settings.ALLEGRO_DOWNLOAD_WORKERS) as pool, \
+                tqdm(total=len(offers)) as progress:
+            pending = {}
+            for offer_id in offer_ids:
+                pending[pool.submit(self._fetch_offer_details_in_thread, offer_id)] = offer_id
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    offer_id = pending.pop(future)
+                    progress.update(1)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to download offer {offer_id}: {e}")
+                        if failed is not None:
+                            failed.append(offer_id)
+                    next_id = next(offer_ids, None)
+                    if next_id is not None:
+                        pending[pool.submit(self._fetch_offer_details_in_thread, next_id)] = next_id
+
+    def iter_catalogue(self, failed: Optional[List[str]] = None) -> Iterator[dict]:
+        return self.iter_offer_details(self.fetch_all_offers(), failed)
+
     def download_catalogue(self) -> list:
-        all_offers = self.fetch_all_offers()
-        detailed_offers = []
-        for o in tqdm(all_offers):
-            full = self.fetch_offer_details(o['id'])
-            detailed_offers.append(full)
-        return detailed_offers
+        return list(self.iter_catalogue())
 
     @staticmethod
     def extract_parameters(full_offer: dict) -> dict:
@@ -147,39 +304,28 @@ class AllegroConnector:
                 desc.append(content)
         return '\n'.join(desc)
 
-    def parse_catalogue(self, detailed_offers: list) -> list:
-        parsed = []
+    def parse_offer(self, o: dict) -> dict:
+        row = {
+            'offerId': o.get('id'),
+            'offerName': o.get('name'),
+            'description': self.extract_description(o),
+        }
+        params = self.extract_parameters(o)
+        row.update(params)
+        return row
+
+    def iter_parse_catalogue(self, detailed_offers: Iterable[dict]) -> Iterator[dict]:
         for o in detailed_offers:
-            row = {
-                'offerId': o.get('id'),
-                'offerName': o.get('name'),
-                'description': self.extract_description(o),
-            }
-            params = self.extract_parameters(o)
-            row.update(params)
-            parsed.append(row)
-        return parsed
+            yield self.parse_offer(o)
+
+    def parse_catalogue(self, detailed_offers: list) -> list:
+        return list(self.iter_parse_catalogue(detailed_offers))
 
     @staticmethod
-    def export_to_xlsx(rows: list, filename: str = 'catalogue.xlsx'):
-        wb = Workbook()
-        ws = wb.active
-        if not rows:
-            wb.save(filename)
-            return
-        headers = list(rows[0].keys())
-        ws.append(headers)
-        for r in rows:
-            ws.append([r.get(h, '') for h in headers])
-        wb.save(filename)
+    def export_to_xlsx(rows: Iterable[dict], filename: str = 'catalogue.xlsx'):
+        # Rows may be a generator; every parameter any offer has gets a column
+        write_xlsx(rows, filename)
 
     @staticmethod
-    def export_to_csv(rows: list, filename: str = 'catalogue.csv'):
-        if not rows:
-            return
-        fieldnames = list(rows[0].keys())
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for r in rows:
-                writer.writerow(r)
\ No newline at end of file
+    def export_to_csv(rows: Iterable[dict], filename: str = 'catalogue.csv'):
+        write_csv(rows, filename)
@@ -0,0 +1,77 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..models import AllegroAuthToken
+
+logger = logging.getLogger(__name__)
+
+
+class AllegroTokenManager:
+    """
+    Keeps the Allegro access token in memory until ALLEGRO_TOKEN_REFRESH_MARGIN seconds before it
+    expires, so API calls no longer read AllegroAuthToken each time. The token is refreshed ahead
+    of expiry by one thread of the process, holding a row lock on the token, so concurrent workers
+    never spend the same (single-use) refresh token twice: the others wait and reuse the result.
+    """
+
+    def __init__(self, margin: Optional[int] = None):
+        self.margin = timedelta(seconds=margin if margin is not None else settings.ALLEGRO_TOKEN_REFRESH_MARGIN)
+        self._lock = threading.Lock()
+        self._access_token: Optional[str] = None
+        self._valid_until: Optional[datetime] = None
+
+    def _is_fresh(self, expires_at: Optional[datetime]) -> bool:
+        return expires_at is not None and timezone.now() < expires_at - self.margin
+
+    def get_access_token(self, refresh: Callable[[str], Dict]) -> Optional[str]:
+        """Return a valid access token, calling ``refresh(refresh_token)`` when it is about to expire."""
+        if self._access_token is not None and self._is_fresh(self._valid_until):
+            return self._access_token
+
+        with self._lock:
+            if self._access_token is not None and self._is_fresh(self._valid_until):
+                return self._access_token
+            return self._load(refresh)
+
+    def _load(self, refresh: Callable[[str], Dict]) -> Optional[str]:
+        token = AllegroAuthToken.objects.first()
+        if token is None:
+            self.invalidate()
+            return None
+
+        if not self._is_fresh(token.expires_at):
+            with transaction.atomic():
+                # Another worker may have refreshed it while we waited for the lock
+                token = AllegroAuthToken.objects.select_for_update().get(pk=token.pk)
+                if not self._is_fresh(token.expires_at):
+                    logger.info("Refreshing Allegro access token")
+                    new_token = refresh(token.refresh_token)
+                    token.access_token = new_token['access_token']
+                    token.refresh_token = new_token['refresh_token']
+                    token.expires_at = timezone.now() + timedelta(seconds=new_token['expires_in'])
+                    token.save()
+
+        self._access_token = token.access_token
+        self._valid_until = token.expires_at
+        return self._access_token
+
+    def invalidate(self):
+        """Forget the cached token, e.g. after Allegro rejected it or a new one was authorized."""
+        self._access_token = None
+        self._valid_until = None
+
+
+allegro_token_manager = AllegroTokenManager()
+
+
+@receiver([post_save, post_delete], sender=AllegroAuthToken)
+def _invalidate_on_token_change(sender, **kwargs):
+    allegro_token_manager.invalidate()
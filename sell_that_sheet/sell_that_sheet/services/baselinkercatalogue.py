@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = "categories"
+MANUFACTURERS = "manufacturers"
+
+
+class CatalogueCache:
+    """
+    Process-wide TTL cache for BaseLinker catalogue lists (categories, manufacturers).
+    Entries live in memory and, when BASELINKER_CATALOGUE_CACHE_ALIAS is set, are
+    mirrored to that Django cache backend so other workers can reuse them.
+    Every change bumps a per-kind version which dependent indexes can compare against.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, cache_alias: Optional[str] = None):
+        self.ttl = ttl if ttl is not None else settings.BASELINKER_CATALOGUE_TTL
+        self.cache_alias = cache_alias if cache_alias is not None else settings.BASELINKER_CATALOGUE_CACHE_ALIAS
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def _cache_key(self, kind: str) -> str:
+        return f"baselinker_catalogue:{kind}"
+
+    def _shared_cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def _store(self, kind: str, items: List[Dict], share: bool = True):
+        self._entries[kind] = (time.monotonic() + self.ttl, items)
+        self._versions[kind] = self._versions.get(kind, 0) + 1
+        shared = self._shared_cache()
+        if share and shared is not None:
+            shared.set(self._cache_key(kind), items, self.ttl)
+
+    def get(self, kind: str, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Return the cached list for ``kind``, calling ``fetch`` when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(kind)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+
+            shared = self._shared_cache()
+            items = shared.get(self._cache_key(kind)) if shared is not None else None
+            if items is not None:
+                self._store(kind, items, share=False)
+                return items
+
+            logger.info(f"Fetching {kind} from BaseLinker")
+            items = fetch()
+            self._store(kind, items)
+            return items
+
+    def add(self, kind: str, item: Dict):
+        """
+        Insert a newly created entry into this process' list without refetching it. The shared copy
+        is dropped rather than overwritten, as other workers may have added entries of their own,
+        and the local entry keeps its expiry so it is still refetched once the TTL runs out.
+        """
+        with self._lock:
+            shared = self._shared_cache()
+            if shared is not None:
+                shared.delete(self._cache_key(kind))
+            entry = self._entries.get(kind)
+            if entry is None:
+                return
+            expires_at, items = entry
+            self._entries[kind] = (expires_at, items + [item])
+            self._versions[kind] = self._versions.get(kind, 0) + 1
+
+    def invalidate(self, kind: Optional[str] = None):
+        with self._lock:
+            kinds = [kind] if kind else list(self._entries.keys())
+            shared = self._shared_cache()
+            for k in kinds:
+                self._entries.pop(k, None)
+                self._versions[k] = self._versions.get(k, 0) + 1
+                if shared is not None:
+                    shared.delete(self._cache_key(k))
+
+    def version(self, kind: str) -> int:
+        return self._versions.get(kind, 0)
+
+
+catalogue_cache = CatalogueCache()
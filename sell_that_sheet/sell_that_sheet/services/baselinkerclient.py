@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Union
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, stop_after_attempt, wait_exponential, retry_if_exception
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+
+
+class BaseLinkerRateLimitError(Exception):
+    """Raised when BaseLinker rejects a call because the query limit was exceeded."""
+
+    def __init__(self, error_code: str, message: str = ""):
+        super().__init__(f"{error_code}: {message}")
+        self.error_code = error_code
+        self.message = message
+
+
+class RateLimiter:
+    """Spaces calls evenly so that at most ``per_minute`` of them start within a minute."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Statuses with which a server says it did not process the call
+NOT_PROCESSED_STATUSES = {429}
+# Gateway statuses after which the call may or may not have reached BaseLinker
+GATEWAY_STATUSES = {502, 503, 504}
+
+
+def is_read_only(method: str) -> bool:
+    """BaseLinker's get* methods only read data, so resending them never duplicates anything."""
+    return method.startswith("get")
+
+
+def is_retryable(method: str, exc: BaseException) -> bool:
+    """
+    Whether a failed call may be sent again. Every BaseLinker call is a POST, so this decides by
+    API method: writes such as addInventoryProduct are only resent when BaseLinker is known not to
+    have acted on them; read-only methods are also resent after read timeouts and gateway errors.
+    """
+    if isinstance(exc, BaseLinkerRateLimitError):
+        return True
+    status = exc.response.status_code if isinstance(exc, requests.HTTPError) and exc.response is not None else None
+    if status in NOT_PROCESSED_STATUSES:
+        return True
+    if not is_read_only(method):
+        return False
+    return status in GATEWAY_STATUSES or isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _build_session() -> requests.Session:
+    # Only connection failures are retried here: the request never reached BaseLinker. Statuses
+    # and read timeouts are left to BaseLinkerClient, which knows whether the method is a write.
+    transport_retry = Retry(
+        total=settings.BASELINKER_MAX_RETRIES,
+        connect=settings.BASELINKER_MAX_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=settings.BASELINKER_RETRY_BACKOFF,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.BASELINKER_POOL_SIZE,
+        max_retries=transport_retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the per-process keep-alive session used for every BaseLinker call.
+    The session is recreated after a fork so Celery/gunicorn workers never share sockets.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+class BaseLinkerClient:
+    """
+    Thin wrapper around the BaseLinker connector endpoint.
+    Uses the shared pooled session, applies connect/read timeouts and retries
+    calls rejected with one of the rate-limit error codes.
+    """
+
+    def __init__(self, token: Optional[str] = None, url: Optional[str] = None):
+        self.url = url or settings.BASELINKER_API_URL
+        self.headers = {"X-BLToken": token or settings.BASELINKER_API_KEY}
+        self.timeout = (settings.BASELINKER_CONNECT_TIMEOUT, settings.BASELINKER_READ_TIMEOUT)
+
+    def call(self, method: str, data: Optional[Union[Dict, str]] = None) -> Dict:
+        payload = {
+            "method": method,
+            "parameters": json.dumps(data or {}) if not isinstance(data, str) else data,
+        }
+        logger.debug(f"Sending POST request to {self.url} with method: {method}")
+        retrying = Retrying(
+            stop=stop_after_attempt(settings.BASELINKER_MAX_RETRIES + 1),
+            wait=wait_exponential(multiplier=settings.BASELINKER_RETRY_BACKOFF, max=60),
+            retry=retry_if_exception(lambda exc: is_retryable(method, exc)),
+            reraise=True,
+        )
+        return retrying(self._send, payload)
+
+    def _send(self, payload: Dict) -> Dict:
+        response = get_session().post(self.url, headers=self.headers, data=payload, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") == "ERROR" and data.get("error_code") in settings.BASELINKER_RATE_LIMIT_ERROR_CODES:
+            logger.warning(f"BaseLinker rate limit hit for {payload['method']}: {data.get('error_message')}")
+            raise BaseLinkerRateLimitError(data.get("error_code"), data.get("error_message", ""))
+        return data
@@ -1,20 +1,29 @@
 import os
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
 import requests
-import json
-from difflib import SequenceMatcher
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from django.conf import settings
+from django.db import connection
 
-from .feature_translation_service import translate_name_description, translate_features_dict
+from .feature_translation_service import (
+    TranslationRequest,
+    prefetch_translations,
+    translate_features_dict,
+    translate_name_description,
+)
 from .utils import (
     prepare_temp_directory,
     remove_temp_directory,
-    parse_photos,
-    limit_photo_size,
 )
-from ..models import AddInventoryProduct, AddInventoryProductResponse
-from .allegroconnector import AllegroConnector
+from .photocache import get_listing_photos
+from ..models import AddInventoryProduct, AddInventoryProductResponse, AuctionUploadResult
+from .baselinkerclient import BaseLinkerClient, BaseLinkerRateLimitError, RateLimiter
+from .baselinkercatalogue import catalogue_cache, CATEGORIES, MANUFACTURERS
+from .manufacturermatcher import get_manufacturer_matcher
+from .categorypathresolver import category_path_resolver
 
 from ..models import AuctionSet, PhotoSet
 from ..models.addInventoryProduct import prepare_tags, get_category_tags_field_name, \
@@ -22,6 +31,10 @@ from ..models.addInventoryProduct import prepare_tags, get_category_tags_field_n
 
 logger = logging.getLogger(__name__)
 
+# Serializes category/manufacturer creation so parallel preparation doesn't create duplicates
+_create_lock = threading.RLock()
+upload_rate_limiter = RateLimiter(settings.BASELINKER_REQUESTS_PER_MINUTE)
+
 BASELINKER_TO_ALLEGRO_CATEGORY_ID = {
     '966013':'313853',
     '967175':'256695',
@@ -396,36 +409,89 @@ BASELINKER_TO_ALLEGRO_CATEGORY_ID = {
 }
 
 
-class BaseLinkerService:
-    BASE_URL = "https://api.baselinker.com/connector.php"
-    BASE_HEADER = {
-        "X-BLToken": settings.BASELINKER_API_KEY,
-    }
+def upload_result(auction_id: int, response: AddInventoryProductResponse) -> AuctionUploadResult:
+    return AuctionUploadResult(
+        auction_id=auction_id,
+        status=response.status,
+        product_id=response.product_id,
+        warnings=response.warnings,
+        error=response.error_message,
+    )
+
+
+def run_upload_pipeline(
+        auctions: List,
+        prepare: Callable[[object], AddInventoryProduct],
+        upload: Callable[[AddInventoryProduct], AddInventoryProductResponse],
+        on_progress: Optional[Callable[[int, str, Optional[AuctionUploadResult]], None]] = None,
+) -> List[AuctionUploadResult]:
+    """
+    Run ``prepare`` for the auctions on BASELINKER_PREPARE_WORKERS threads and hand each product
+    to ``upload`` on BASELINKER_UPLOAD_WORKERS threads as soon as it is ready. A failing auction
+    is reported in its result instead of aborting the rest.
+    """
+    def report(auction_id, stage, result=None):
+        if on_progress is not None:
+            on_progress(auction_id, stage, result)
+
+    results: Dict[int, AuctionUploadResult] = {}
+    with ThreadPoolExecutor(max_workers=settings.BASELINKER_PREPARE_WORKERS) as prepare_pool, \
+            ThreadPoolExecutor(max_workers=settings.BASELINKER_UPLOAD_WORKERS) as upload_pool:
+        prepare_futures = {prepare_pool.submit(prepare, auction): auction for auction in auctions}
+        upload_futures = {}
+        for future in as_completed(prepare_futures):
+            auction = prepare_futures[future]
+            try:
+                product = future.result()
+            except Exception as e:
+                logger.error(f"Failed to prepare auction {auction.id}", exc_info=e)
+                results[auction.id] = AuctionUploadResult(auction_id=auction.id, status="ERROR", error=str(e))
+                report(auction.id, "failed", results[auction.id])
+                continue
+            report(auction.id, "prepared")
+            upload_futures[upload_pool.submit(upload, product)] = auction
+
+        for future in as_completed(upload_futures):
+            auction = upload_futures[future]
+            try:
+                results[auction.id] = upload_result(auction.id, future.result())
+            except Exception as e:
+                results[auction.id] = AuctionUploadResult(auction_id=auction.id, status="ERROR", error=str(e))
+            report(auction.id, "uploaded" if results[auction.id].status == "SUCCESS" else "failed", results[auction.id])
+
+    return [results[auction.id] for auction in auctions]
 
 
+class BaseLinkerService:
+    BASE_URL = settings.BASELINKER_API_URL
+
     def __init__(self):
-        self.categories = self.get_categories()
-        self.manufacturers = self.get_manufacturers()
+        self.client = BaseLinkerClient(url=self.BASE_URL)
+
+    @property
+    def categories(self) -> List[Dict]:
+        return self.get_categories()
+
+    @property
+    def manufacturers(self) -> List[Dict]:
+        return self.get_manufacturers()
 
     def _post(self, method: str, data: Optional[Dict] = None) -> Dict:
-        payload = {
-            "method": method,
-            "parameters": json.dumps(data or {}) if not isinstance(data, str) else data,
-        }
-        logger.debug(f"Sending POST request to {self.BASE_URL} with payload: {payload}")
         try:
-            response = requests.post(url=self.BASE_URL, headers=self.BASE_HEADER, data=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return self.client.call(method, data)
+        except (requests.RequestException, BaseLinkerRateLimitError) as e:
             logger.error(f"Error during BaseLinker API request: {e}")
             raise
 
+    def _fetch_list(self, method: str, key: str) -> List[Dict]:
+        response = self._post(method)
+        if response.get('status') == 'ERROR':
+            raise ValueError(f"{method} failed: {response.get('error_message')}")
+        return response.get(key, [])
+
     def get_categories(self) -> List[Dict]:
         try:
-            logger.info("Fetching categories from BaseLinker")
-            response = self._post("getInventoryCategories")
-            return response.get('categories', [])
+            return catalogue_cache.get(CATEGORIES, lambda: self._fetch_list("getInventoryCategories", "categories"))
         except Exception as e:
             logger.error("Failed to fetch categories", exc_info=e)
             return []
@@ -435,59 +501,51 @@ class BaseLinkerService:
         try:
             response = self._post("addInventoryCategory", {"name": name, "parent_id": 0})
             new_category_id = int(response['category_id'])
-            # Refresh categories after creation
-            self.categories = self.get_categories()
+            catalogue_cache.add(CATEGORIES, {"category_id": new_category_id, "name": name, "parent_id": 0})
             return new_category_id
         except Exception as e:
             logger.error(f"Failed to create category {name}", exc_info=e)
             raise
 
     def match_category(self, category) -> int:
-        connector = AllegroConnector()
-        tree = connector.get_category_tree(category)
+        tree = category_path_resolver.resolve(category)
         logger.info(f"Matching category for tree: {tree}")
-        for category in self.categories:
-            if category['name'] == tree:
-                return category['category_id']
-        # If not found, create a new category
-        print(f"Creating new category: {tree}")
-        return self.create_category(tree)
+        with _create_lock:
+            for category in self.categories:
+                if category['name'] == tree:
+                    return category['category_id']
+            # If not found, create a new category
+            logger.debug(f"Creating new category: {tree}")
+            return self.create_category(tree)
 
     def get_manufacturers(self) -> List[Dict]:
         try:
-            logger.info("Fetching manufacturers from BaseLinker")
-            response = self._post("getInventoryManufacturers")
-            return response.get('manufacturers', [])
+            return catalogue_cache.get(MANUFACTURERS, lambda: self._fetch_list("getInventoryManufacturers", "manufacturers"))
         except Exception as e:
             logger.error("Failed to fetch manufacturers", exc_info=e)
             return []
 
     def match_manufacturer(self, name: str) -> Optional[int]:
         logger.info(f"Matching manufacturer for: {name}")
-        original_name = name
-        name = name.lower()
-        max_distance = 0.9
-        matched_id = None
-
-        for manufacturer in self.manufacturers:
-            if manufacturer['name'].lower() == name:
-                return manufacturer['manufacturer_id']
-            distance = SequenceMatcher(None, name, manufacturer['name'].lower()).ratio()
-            if distance > max_distance:
-                max_distance = distance
-                matched_id = manufacturer['manufacturer_id']
-
-        if not matched_id:
-            matched_id = self.create_manufacturer(original_name)
-        return matched_id
+        matched_id = self._match_existing_manufacturer(name)
+        if matched_id:
+            return matched_id
+
+        with _create_lock:
+            # Another upload thread may have created it meanwhile
+            return self._match_existing_manufacturer(name) or self.create_manufacturer(name)
+
+    def _match_existing_manufacturer(self, name: str) -> Optional[int]:
+        manufacturers = self.manufacturers
+        matcher = get_manufacturer_matcher(manufacturers, catalogue_cache.version(MANUFACTURERS))
+        return matcher.match(name)
 
     def create_manufacturer(self, name: str) -> int:
         logger.info(f"Creating new manufacturer: {name}")
         try:
             response = self._post("addInventoryManufacturer", {"name": name})
             new_manufacturer_id = int(response['manufacturer_id'])
-            # Refresh manufacturers after creation
-            self.manufacturers = self.get_manufacturers()
+            catalogue_cache.add(MANUFACTURERS, {"manufacturer_id": new_manufacturer_id, "name": name})
             return new_manufacturer_id
         except Exception as e:
             logger.error(f"Failed to create manufacturer {name}", exc_info=e)
@@ -503,27 +561,49 @@ class BaseLinkerService:
             logger.error(f"Failed to upload product {product.sku}", exc_info=e)
             raise
 
-    def prepare_products(self, auctionset: AuctionSet) -> List[AddInventoryProduct]:
-        products = []
+    def _prepare_product(self, auction, auctionset: AuctionSet) -> AddInventoryProduct:
+        try:
+            return AddInventoryProduct.from_auction(auction=auction, inventory_id=1430, match_manufacturer=self.match_manufacturer, match_category=self.match_category, owner=auctionset.owner, author=auctionset.creator)
+        finally:
+            # Worker threads get their own DB connection, don't leak it
+            connection.close()
+
+    def _rate_limited_upload(self, product: AddInventoryProduct) -> AddInventoryProductResponse:
+        upload_rate_limiter.wait()
+        return self.upload_product(product)
+
+    def upload_products(
+            self,
+            auctionset: AuctionSet,
+            on_progress: Optional[Callable[[int, str, Optional[AuctionUploadResult]], None]] = None,
+    ) -> List[AuctionUploadResult]:
+        """
+        Prepare and upload every auction of the set.
+        Auctions are prepared concurrently (translations, photos, matching) and each one is handed
+        to a rate-limited uploader as soon as it is ready. A failing auction is reported in its
+        result instead of aborting the rest of the set.
+        ``on_progress(auction_id, stage, result)`` is called with stage "prepared", "uploaded" or "failed".
+        """
+        auctions = list(auctionset.auctions.all())
+        # Translate the whole set in a few batched requests; from_auction then reads the cache
+        prefetch_translations(AddInventoryProduct.translation_requests(auctions))
         tmp_dir = prepare_temp_directory()
-        for auction in auctionset.auctions.all():
-            product = AddInventoryProduct.from_auction(auction=auction, inventory_id=1430, match_manufacturer=self.match_manufacturer, match_category=self.match_category, owner=auctionset.owner, author=auctionset.creator)
-            products.append(product)
-        remove_temp_directory(tmp_dir)
-        return products
-
-    def upload_products(self, auctionset: AuctionSet) -> List[AddInventoryProductResponse]:
-        products = self.prepare_products(auctionset)
-        responses = []
-        for product in products:
-            response = self.upload_product(product)
-            responses.append(response)
-        return responses
+        try:
+            return run_upload_pipeline(
+                auctions,
+                lambda auction: self._prepare_product(auction, auctionset),
+                self._rate_limited_upload,
+                on_progress,
+            )
+        finally:
+            remove_temp_directory(tmp_dir)
 
     def translate_existing_products_to_language(self, auctionset, language: str = "de") -> List[
         AddInventoryProductResponse]:
         responses = []
-        for auction in auctionset.auctions.all():
+        auctions = list(auctionset.auctions.all())
+        prefetch_translations(AddInventoryProduct.translation_requests(auctions))
+        for auction in auctions:
             try:
                 product = AddInventoryProduct.from_auction(
                     inventory_id=self.inventory_id,
@@ -553,85 +633,197 @@ class BaseLinkerService:
         return responses
 
 
-    def translate_product_parameters(
-            self,
-            product_ids: List[int],
-            target_lang: str = "de",
-            inventory_id: int = 1430
-    ) -> List[Dict]:
-        logger.info(f"Translating parameters to '{target_lang}' for products: {product_ids}")
-        responses = []
+    def _product_translation_context(self, product_id, product: Dict) -> Dict:
+        text_fields = product.get("text_fields", {})
+        features = text_fields.get("features")
+        product_category = product.get("category_id")
+        allegro_category_id = int(BASELINKER_TO_ALLEGRO_CATEGORY_ID.get(str(product_category)))
+        serial_numbers = features.get(get_category_part_number_field_name(allegro_category_id))
+        tags = features.get(get_category_auto_tags_field_name(allegro_category_id)) or ""
+
+        if tags:
+            del features[get_category_auto_tags_field_name(allegro_category_id)]
+        if serial_numbers:
+            del features[get_category_part_number_field_name(allegro_category_id)]
+
+        return {
+            "product_id": product_id,
+            "product": product,
+            "features": features,
+            "name": text_fields.get("name"),
+            "description": text_fields.get("description", text_fields.get("description_extra4")),
+            "category_id": allegro_category_id,
+            "serial_numbers": serial_numbers,
+            "tags": tags,
+        }
 
+    def _translate_product(self, context: Dict, target_lang: str, inventory_id) -> Tuple[Optional[Dict], Optional[str]]:
+        """Return the addInventoryProduct payload for one product, or None and the reason it was skipped."""
         try:
-            product_data = self._post("getInventoryProductsData", {
-                "inventory_id": inventory_id,
-                "products": product_ids,
-            }).get("products", {})
+            product_id, product, features = context["product_id"], context["product"], context["features"]
+            product_name, product_description = context["name"], context["description"]
+            product_price_pln = product.get("prices", {}).get("1184")
+            product_price_euro = product.get("prices", {}).get("4848")
+            product_weight = product.get("weight")
 
-            for product_id, product in product_data.items():
-                text_fields = product.get("text_fields", {})
-                features = text_fields.get("features")
-                product_price_pln = product.get("prices", {}).get("1184")
-                product_price_euro = product.get("prices", {}).get("4848")
-                product_weight = product.get("weight")
-
-                product_name, product_description = text_fields.get("name"), text_fields.get("description", text_fields.get("description_extra4"))
-                product_category = product.get("category_id")
-                product_allegro_category_id = int(BASELINKER_TO_ALLEGRO_CATEGORY_ID.get(str(product_category)))
-                product_serial_numbers = features.get(get_category_part_number_field_name(product_allegro_category_id))
-                product_tags = features.get(get_category_auto_tags_field_name(product_allegro_category_id)) or ""
-
-                if product_tags:
-                    del features[get_category_auto_tags_field_name(product_allegro_category_id)]
-                if product_serial_numbers:
-                    del features[get_category_part_number_field_name(product_allegro_category_id)]
-
-                auto_tags = prepare_tags(
-                    product_allegro_category_id, product_name, product_tags
-                )
+            auto_tags = prepare_tags(context["category_id"], product_name, context["tags"])
 
-                translated_name, translated_description = translate_name_description(
-                    product_name,
-                    product_description or "",
-                    product_allegro_category_id,
-                    target_lang,
-                )
+            translated_name, translated_description = translate_name_description(
+                product_name,
+                product_description or "",
+                context["category_id"],
+                target_lang,
+            )
 
-                if not translated_name:
-                    logger.warning(f"Translation name/desc ({product_name}/{product_description}) output: {translated_name}, {translated_description}")
-                    logger.warning(f"Product {product_id} has no name or description to translate.")
-                    continue
+            if not translated_name:
+                logger.warning(f"Translation name/desc ({product_name}/{product_description}) output: {translated_name}, {translated_description}")
+                logger.warning(f"Product {product_id} has no name or description to translate.")
+                return None, "no name or description to translate"
 
-                if not features:
-                    logger.warning(f"Product {product_id} has no features to translate.")
-                    continue
+            if not features:
+                logger.warning(f"Product {product_id} has no features to translate.")
+                return None, "no features to translate"
 
-                translated_features = self._translate_features(features, target_lang, product_allegro_category_id, product_serial_numbers, auto_tags, product_name)
+            translated_features = self._translate_features(features, target_lang, context["category_id"], context["serial_numbers"], auto_tags, product_name)
 
-                update_payload = {
-                    "inventory_id": inventory_id,
-                    "product_id": str(product_id),
-                    "text_fields": {
-                        f"name|{target_lang}": translated_name,
-                        f"description_extra1|{target_lang}": translated_description,
-                        f"features|{target_lang}": translated_features
-                    }
+            update_payload = {
+                "inventory_id": inventory_id,
+                "product_id": str(product_id),
+                "text_fields": {
+                    f"name|{target_lang}": translated_name,
+                    f"description_extra1|{target_lang}": translated_description,
+                    f"features|{target_lang}": translated_features
                 }
+            }
 
-                if product_weight and not product_price_euro:
-                    update_payload["prices"] = {
-                        "4848": calculate_price_euro(product_price_pln, int(product_weight))
-                    }
+            if product_weight and not product_price_euro:
+                update_payload["prices"] = {
+                    "4848": calculate_price_euro(product_price_pln, int(product_weight))
+                }
 
-                logger.info(f"Updating product {product_id} with {target_lang} features: {translated_features}")
-                result = self._post("addInventoryProduct", update_payload)
-                responses.append({"product_id": product_id, "status": result.get("status")})
+            logger.info(f"Updating product {product_id} with {target_lang} features: {translated_features}")
+            return update_payload, None
+        finally:
+            # Worker threads get their own DB connection, don't leak it
+            connection.close()
 
-        except Exception as e:
-            logger.error("Error while translating product parameters", exc_info=e)
-            raise
+    def _rate_limited_post(self, method: str, data: Dict) -> Dict:
+        upload_rate_limiter.wait()
+        return self._post(method, data)
 
-        return responses
+    def iter_inventory_product_pages(
+            self,
+            inventory_id,
+            product_ids: List[int],
+            page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Yield getInventoryProductsData results one page of BASELINKER_PRODUCTS_PAGE_SIZE ids at a
+        time. The next page is already being downloaded while the caller works on the current one.
+        """
+        page_size = page_size or settings.BASELINKER_PRODUCTS_PAGE_SIZE
+        pages = [product_ids[i:i + page_size] for i in range(0, len(product_ids), page_size)]
+        if not pages:
+            return
+
+        def fetch(ids):
+            return self._post("getInventoryProductsData", {
+                "inventory_id": inventory_id,
+                "products": ids,
+            }).get("products", {})
+
+        with ThreadPoolExecutor(max_workers=1) as prefetch_pool:
+            future = prefetch_pool.submit(fetch, pages[0])
+            for next_ids in pages[1:] + [None]:
+                products = future.result()
+                if next_ids is not None:
+                    future = prefetch_pool.submit(fetch, next_ids)
+                yield products
+
+    def _collect_translation_results(self, pending: Dict, uploads: set, upload_pool, timeout=None) -> Iterator[Dict]:
+        """
+        Wait for at least one pending translation/upload (or ``timeout``) and yield the results of the
+        finished ones; finished translations are handed to the upload pool.
+        """
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            product_id = pending.pop(future)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.error(f"Error while translating product {product_id}", exc_info=e)
+                yield {"product_id": product_id, "status": "ERROR", "error": str(e)}
+                continue
+
+            if future in uploads:
+                uploads.discard(future)
+                result = {"product_id": product_id, "status": outcome.get("status")}
+                if outcome.get("status") == "ERROR":
+                    result["error"] = outcome.get("error_message")
+                yield result
+                continue
+
+            update_payload, skip_reason = outcome
+            if update_payload is None:
+                yield {"product_id": product_id, "status": "SKIPPED", "error": skip_reason}
+                continue
+            upload = upload_pool.submit(self._rate_limited_post, "addInventoryProduct", update_payload)
+            uploads.add(upload)
+            pending[upload] = product_id
+
+    def iter_translate_product_parameters(
+            self,
+            product_ids: List[int],
+            target_lang: str = "de",
+            inventory_id: int = 1430
+    ) -> Iterator[Dict]:
+        """
+        Translate the products and write the translations back to BaseLinker, yielding
+        ``{"product_id", "status"[, "error"]}`` as each product finishes.
+        Product data is fetched page by page and each page is batch-translated before its products
+        are queued. Translations run on OPENAI_TRANSLATION_WORKERS threads and the writes on the
+        rate-limited BASELINKER_UPLOAD_WORKERS threads, so the two APIs are throttled independently.
+        A failing product yields status "ERROR" and does not stop the others; products with nothing
+        to translate yield "SKIPPED".
+        """
+        logger.info(f"Translating parameters to '{target_lang}' for {len(product_ids)} products: {product_ids}")
+
+        with ThreadPoolExecutor(max_workers=settings.OPENAI_TRANSLATION_WORKERS) as translate_pool, \
+                ThreadPoolExecutor(max_workers=settings.BASELINKER_UPLOAD_WORKERS) as upload_pool:
+            pending, uploads = {}, set()
+            for products in self.iter_inventory_product_pages(inventory_id, product_ids):
+                contexts = []
+                for product_id, product in products.items():
+                    try:
+                        contexts.append(self._product_translation_context(product_id, product))
+                    except Exception as e:
+                        logger.error(f"Cannot translate product {product_id}", exc_info=e)
+                        yield {"product_id": product_id, "status": "ERROR", "error": str(e)}
+                del products
+
+                # One batched pass over the page fills the translation cache used by the per-product calls
+                prefetch_translations([
+                    TranslationRequest(c["name"], c["description"] or "", c["category_id"], c["features"] or {})
+                    for c in contexts
+                ])
+                for context in contexts:
+                    pending[translate_pool.submit(self._translate_product, context, target_lang, inventory_id)] = context["product_id"]
+
+                yield from self._collect_translation_results(pending, uploads, upload_pool, timeout=0)
+                # Keep about one page in flight, so memory stays bounded while the next page downloads
+                while len(pending) > settings.BASELINKER_PRODUCTS_PAGE_SIZE:
+                    yield from self._collect_translation_results(pending, uploads, upload_pool)
+
+            while pending:
+                yield from self._collect_translation_results(pending, uploads, upload_pool)
+
+    def translate_product_parameters(
+            self,
+            product_ids: List[int],
+            target_lang: str = "de",
+            inventory_id: int = 1430
+    ) -> List[Dict]:
+        return list(self.iter_translate_product_parameters(product_ids, target_lang, inventory_id))
 
     def copy_product_with_images(
         self,
@@ -679,8 +871,7 @@ class BaseLinkerService:
                 photos.remove(thumb_path)
             photos.insert(0, thumb_path)
 
-        photos = parse_photos(photos, settings.PHOTOSET_MAX_PHOTOS)
-        photos = limit_photo_size(photos)
+        photos = get_listing_photos(photos, settings.PHOTOSET_MAX_PHOTOS)
         images = {idx: path for idx, path in enumerate(photos)}
 
         payload = {
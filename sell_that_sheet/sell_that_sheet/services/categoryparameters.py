@@ -0,0 +1,69 @@
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from ..models import AllegroCategoryParameters, Parameter
+from .allegroconnector import AllegroConnector
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "allegro:category-parameters:{}"
+
+
+def register_parameters(parameters: List[Dict]):
+    """
+    Create the Parameter rows Allegro lists that are not known yet. The unique_allegro_parameter_id
+    constraint makes this a single insert; backends without partial indexes (MySQL) do not create
+    that constraint, so known ids are looked up first there.
+    """
+    new = {p["id"]: Parameter(allegro_id=p["id"], name=p["name"], type=p["type"]) for p in parameters}
+    if not connection.features.supports_partial_indexes:
+        for allegro_id in Parameter.objects.filter(allegro_id__in=list(new)).values_list("allegro_id", flat=True):
+            new.pop(allegro_id, None)
+    Parameter.objects.bulk_create(list(new.values()), ignore_conflicts=True)
+
+
+def get_category_parameters(category_id, connector: Optional[AllegroConnector] = None) -> Tuple[Dict, Optional[str]]:
+    """
+    The /sale/categories/{id}/parameters response for ``category_id`` and its ETag. Responses are
+    served from the Django cache, then from AllegroCategoryParameters while younger than
+    ALLEGRO_CATEGORY_PARAMETERS_TTL seconds; older ones are revalidated with If-None-Match, so
+    Allegro only sends the body again when the parameters changed. New parameters are registered
+    whenever a body is downloaded.
+    """
+    category_id = str(category_id)
+    key = CACHE_KEY.format(category_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    ttl = settings.ALLEGRO_CATEGORY_PARAMETERS_TTL
+    now = timezone.now()
+    stored = AllegroCategoryParameters.objects.filter(category_id=category_id).first()
+    if stored is not None and now - stored.fetched_at < timedelta(seconds=ttl):
+        result = stored.response, stored.etag
+        cache.set(key, result, ttl)
+        return result
+
+    connector = connector or AllegroConnector()
+    url = f"https://api.allegro.pl/sale/categories/{category_id}/parameters"
+    body, etag = connector.make_conditional_get_request(url, stored.etag if stored else None)
+    if body is None:
+        logger.debug(f"Parameters of category {category_id} not modified")
+        stored.fetched_at = now
+        stored.save(update_fields=["fetched_at"])
+    else:
+        stored, _ = AllegroCategoryParameters.objects.update_or_create(
+            category_id=category_id,
+            defaults={"response": body, "etag": etag, "fetched_at": now},
+        )
+        register_parameters(body.get("parameters", []))
+
+    result = stored.response, stored.etag
+    cache.set(key, result, ttl)
+    return result
@@ -0,0 +1,81 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+
+from ..models import AllegroCategoryPath
+from .allegroconnector import AllegroConnector
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryPathResolver:
+    """
+    Resolves Allegro category ids to "A/B/C" paths (same format as
+    AllegroConnector.get_category_tree).
+
+    Paths are looked up in an in-memory LRU first, then in the AllegroCategoryPath
+    table, and only then fetched from Allegro. Every resolved ancestor is stored too,
+    so sibling categories never fetch a shared parent twice.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or settings.CATEGORY_PATH_CACHE_SIZE
+        self._paths: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._connector: Optional[AllegroConnector] = None
+
+    @property
+    def connector(self) -> AllegroConnector:
+        if self._connector is None:
+            self._connector = AllegroConnector()
+        return self._connector
+
+    def _remember(self, category_id: str, path: str):
+        with self._lock:
+            self._paths[category_id] = path
+            self._paths.move_to_end(category_id)
+            while len(self._paths) > self.max_size:
+                self._paths.popitem(last=False)
+
+    def resolve(self, category_id) -> str:
+        category_id = str(category_id)
+        with self._lock:
+            if category_id in self._paths:
+                self._paths.move_to_end(category_id)
+                return self._paths[category_id]
+
+        stored = AllegroCategoryPath.objects.filter(category_id=category_id).values_list('path', flat=True).first()
+        if stored is not None:
+            self._remember(category_id, stored)
+            return stored
+
+        category_data = self.connector.make_authenticated_get_request(
+            'get_category_tree', f"{AllegroConnector.BASE_URL}/sale/categories/{category_id}"
+        )
+        name = category_data.get("name", "")
+        parent_id = (category_data.get("parent") or {}).get("id")
+
+        path = f"{self.resolve(parent_id)}/{name}" if parent_id else name
+        AllegroCategoryPath.objects.update_or_create(
+            category_id=category_id,
+            defaults={"name": name, "parent_id": parent_id, "path": path},
+        )
+        logger.info(f"Resolved Allegro category {category_id} to {path}")
+        self._remember(category_id, path)
+        return path
+
+    def invalidate(self, category_id=None):
+        """Forget cached paths (all of them when no id is given), both in memory and in the DB."""
+        with self._lock:
+            if category_id is None:
+                self._paths.clear()
+                AllegroCategoryPath.objects.all().delete()
+            else:
+                self._paths.pop(str(category_id), None)
+                AllegroCategoryPath.objects.filter(category_id=str(category_id)).delete()
+
+
+category_path_resolver = CategoryPathResolver()
@@ -1,11 +1,11 @@
 from collections import defaultdict
-from typing import Dict, Optional, Union, List
+from typing import Dict, NamedTuple, Optional, Tuple, Union, List
 
 from django.db.models import QuerySet
 
 from ..models import Auction, AuctionParameter
-from ..models.translations import ParameterTranslation, AuctionParameterTranslation
 from ..services.openaiservice import OpenAiService
+from .translation_snapshot import get_translation_snapshot
 
 PARAMETER_SEPARATOR = "|"
 
@@ -51,102 +51,83 @@ def add_custom_translations(features: Dict[str, str]) -> Dict[str, str]:
                 continue
     return tmp_dict
 
+def _split_values(value_name) -> List[str]:
+    value_name = "" if value_name is None else str(value_name)
+    return value_name.split(PARAMETER_SEPARATOR) if PARAMETER_SEPARATOR in value_name else [value_name]
+
+
+def _join_value_translations(translated_values: List[Optional[str]]) -> Optional[str]:
+    return PARAMETER_SEPARATOR.join(translated_values) if None not in translated_values else None
+
+
 def get_translation_auction_parameter(auction_parameter: AuctionParameter):
     """
         Retrieve translations for AuctionParameter's value_name and Parameter's name.
-        First, try to find a translation using allegro_id.
-        Then, search for the exact value_name inside the fetched queryset.
+        The parameter translation is matched by parameter, value translations by
+        the parameter's allegro_id and the exact value_name.
         """
-    # Fetch translation for the parameter
-    parameter_translation = ParameterTranslation.objects.filter(
-        parameter=auction_parameter.parameter
-    ).first()
-
-    # Fetch all possible translations using allegro_id
-    auction_parameter_translations = AuctionParameterTranslation.objects.filter(
-        auction_parameter__parameter__allegro_id=auction_parameter.parameter.allegro_id
-    )
+    return get_auction_parameter_translations_batch([auction_parameter])[0]
 
-    values = []
-    if PARAMETER_SEPARATOR in auction_parameter.value_name:
-        values = auction_parameter.value_name.split(PARAMETER_SEPARATOR)
-    else:
-        values.append(auction_parameter.value_name)
-
-    translated_values = []
-
-    for value in values:
-        # Find the specific translation by matching value_name inside the queryset
-        auction_parameter_translation = auction_parameter_translations.filter(
-            auction_parameter__value_name=value
-        ).first()
-        translated_values.append(auction_parameter_translation.translation if auction_parameter_translation else None)
-
-    return {
-        "parameter_translation": parameter_translation.translation if parameter_translation else None,
-        "value_translation": PARAMETER_SEPARATOR.join(translated_values) if None not in translated_values else None,
-    }
 def get_translations(
     param: Union[Dict[str, Union[str, int]], AuctionParameter]
 ) -> Dict[str, Optional[str]]:
     """
-    Retrieve parameter and value translations from DB. Supports either:
+    Retrieve parameter and value translations. Supports either:
       - a dict with keys 'name', 'value_name', and optional 'allegro_id'
       - an AuctionParameter-like object with .parameter.name, .parameter.allegro_id, and .value_name
     """
-    # Unpack inputs
-    if isinstance(param, dict):
-        name = param.get("name")
-        value_name = param.get("value_name", "")
-    else:
+    if not isinstance(param, dict):
         return get_translation_auction_parameter(param)
 
-    # Lookup parameter translation by allegro_id or name
-    param_qs = ParameterTranslation.objects.filter(
-        parameter__name=name
-    )
-    parameter_translation = param_qs.first()
-
-    # Lookup value translations
-    apt_qs = AuctionParameterTranslation.objects.filter(
-        auction_parameter__parameter__name=name
-    )
+    name = param.get("name")
+    return get_translations_batch({name: param.get("value_name", "")})[name]
 
-    # Handle multiple split values
-    values = (
-        value_name.split(PARAMETER_SEPARATOR)
-        if PARAMETER_SEPARATOR in value_name
-        else [value_name]
-    )
-    translated_values = []
-    for v in values:
-        entry = apt_qs.filter(auction_parameter__value_name=v).first()
-        translated_values.append(entry.translation if entry else None)
 
+def get_translations_batch(features: Dict[str, str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Same as calling get_translations({"name": key, "value_name": value}) for every
+    feature, resolved from the in-memory translation snapshot.
+    """
+    snapshot = get_translation_snapshot()
     return {
-        "parameter_translation": parameter_translation.translation if parameter_translation else None,
-        "value_translation": (
-            PARAMETER_SEPARATOR.join(translated_values)
-            if None not in translated_values
-            else None
-        ),
+        name: {
+            "parameter_translation": snapshot.parameter_by_name.get(name),
+            "value_translation": _join_value_translations(
+                [snapshot.value_by_name.get((name, v)) for v in _split_values(value)]
+            ),
+        }
+        for name, value in features.items()
     }
 
-def translate_features_dict(
-    features: Union[Dict[str, str], List[AuctionParameter]],
+
+def get_auction_parameter_translations_batch(
+    auction_parameters: List[AuctionParameter],
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Batch version of get_translation_auction_parameter, returning results in the
+    order of ``auction_parameters``.
+    """
+    snapshot = get_translation_snapshot()
+    return [
+        {
+            "parameter_translation": snapshot.parameter_by_id.get(ap.parameter_id),
+            "value_translation": _join_value_translations(
+                [snapshot.value_by_allegro_id.get((ap.parameter.allegro_id, v)) for v in _split_values(ap.value_name)]
+            ),
+        }
+        for ap in auction_parameters
+    ]
+
+def resolve_features_dict(
+    features: Dict[str, str],
     category_id: Optional[int] = None,
-    serial_numbers: Optional[str] = None,
-    name: Optional[str] = None,
-    tags: Optional[str] = None,
-    language: str = "de",
     auction_parameters: Optional[QuerySet[AuctionParameter]] = None
-) -> Dict[str, str]:
+) -> Tuple[Dict[str, str], Dict[str, str]]:
     """
-    Translates feature key→value dict using:
+    Resolves features without calling the AI:
       1. Hardcoded translations
       2. DB lookups
-      3. AI fallback
-      4. Always appends reference fields
+    Returns the translated features and the pairs still left for the AI.
     """
     translated: Dict[str, str] = {}
     to_translate: Dict[str, str] = {}
@@ -154,9 +135,7 @@ def translate_features_dict(
         get_category_tags_field_name,
         get_category_part_number_field_name,
         get_category_auto_tags_field_name,
-        prepare_tags,
     )
-    from .baselinkerservice import BASELINKER_TO_ALLEGRO_CATEGORY_ID
 
     # 1. Hardcoded translations
     translated.update(add_custom_translations(features))
@@ -173,14 +152,15 @@ def translate_features_dict(
 
     # 2. DB/AI translation for remaining keys
 
+    db_translations = get_translations_batch({
+        key: value for key, value in features.items()
+        if key not in FUNCTION_TRANSLATED_PARAMETERS and key not in untranslated_fields
+    })
     for key, value in features.items():
-
         if key in FUNCTION_TRANSLATED_PARAMETERS or key in translated or key in untranslated_fields:
             continue
-        # Use dict input to get_translations
-
-        t = get_translations({"name": key, "value_name": value})
 
+        t = db_translations[key]
         param_trans = t.get("parameter_translation") or key
         value_trans = t.get("value_translation")
         if param_trans and value_trans:
@@ -191,18 +171,40 @@ def translate_features_dict(
             to_translate[key] = value
 
     if auction_parameters:
-        for parameter in auction_parameters:
-            t = get_translations(parameter)
-
-            param_trans = t.get("parameter_translation") or key
+        if isinstance(auction_parameters, QuerySet):
+            auction_parameters = auction_parameters.select_related("parameter")
+        auction_parameters = list(auction_parameters)
+        for parameter, t in zip(auction_parameters, get_auction_parameter_translations_batch(auction_parameters)):
+            param_trans = t.get("parameter_translation") or parameter.parameter.name
             value_trans = t.get("value_translation")
 
             if param_trans and value_trans:
                 translated[param_trans] = value_trans
-            elif param_trans:
-                to_translate[param_trans] = parameter.value_name
             else:
-                to_translate[key] = parameter.value_name
+                to_translate[param_trans] = parameter.value_name
+
+    return translated, to_translate
+
+def translate_features_dict(
+    features: Union[Dict[str, str], List[AuctionParameter]],
+    category_id: Optional[int] = None,
+    serial_numbers: Optional[str] = None,
+    name: Optional[str] = None,
+    tags: Optional[str] = None,
+    language: str = "de",
+    auction_parameters: Optional[QuerySet[AuctionParameter]] = None
+) -> Dict[str, str]:
+    """
+    Translates feature key→value dict using:
+      1. Hardcoded translations
+      2. DB lookups
+      3. AI fallback
+      4. Always appends reference fields
+    """
+    from ..models.addInventoryProduct import get_category_tags_field_name, prepare_tags
+
+    # 1-2. Hardcoded and DB translations
+    translated, to_translate = resolve_features_dict(features, category_id, auction_parameters)
 
     # 3. AI fallback
     if to_translate:
@@ -239,4 +241,37 @@ def translate_name_description(name, description, allegro_category_id, target_la
     except Exception as e:
         return None, None
 
-    return translated_product_name, translated_description
\ No newline at end of file
+    return translated_product_name, translated_description
+
+
+class TranslationRequest(NamedTuple):
+    """Inputs of one product's translate_name_description/translate_features_dict calls."""
+    name: Optional[str]
+    description: Optional[str]
+    category_id: Optional[int]
+    features: Dict[str, str]
+    auction_parameters: Optional[List[AuctionParameter]] = None
+
+
+def prefetch_translations(requests: List[TranslationRequest]):
+    """
+    Translates what the given products would send to OpenAI one by one in a few batched
+    requests instead. The results land in the OpenAI translation cache, so the per-product
+    translate_name_description/translate_features_dict calls afterwards are served from it;
+    anything the batches could not translate is simply requested by those calls as before.
+    Products without a name skip the name/description translation.
+    """
+    openai_service = OpenAiService()
+    completions = [(r.name, r.description or "", r.category_id) for r in requests if r.name]
+    pairs = []
+    for r in requests:
+        _, to_translate = resolve_features_dict(r.features, r.category_id, r.auction_parameters)
+        pairs.extend(to_translate.items())
+
+    try:
+        if completions:
+            openai_service.translate_completions_batch(completions)
+        if pairs:
+            openai_service.translate_parameter_pairs_batch(pairs)
+    except Exception as e:
+        print(f"[WARN] Batch translation failed: {e}")
@@ -0,0 +1,155 @@
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models.keyword_translation import KeywordTranslation
+from ..models.translation_example import TranslationExample
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "keyword_index:version"
+
+# Polish inflects word endings ("lampa", "lampy", "lampami", "lewy", "lewe"), so words are matched
+# on a short prefix. A too-short stem only lets a few extra entries through, which is harmless.
+STEM_LENGTH = 4
+MIN_STEM_LENGTH = 3
+
+_word_re = re.compile(r"\w+")
+
+
+def _stem(word: str) -> str:
+    return word[:max(MIN_STEM_LENGTH, min(len(word) - 1, STEM_LENGTH))]
+
+
+def _stems(text: str) -> List[str]:
+    return [_stem(word) for word in _word_re.findall((text or "").lower())]
+
+
+class KeywordIndex:
+    """
+    Trie over the stemmed words of the dictionary entries of one category.
+    ``select(texts)`` returns only the entries whose words all occur, in order,
+    in one of the texts, so prompts carry the relevant part of the dictionary.
+    """
+
+    def __init__(self, entries: Dict[str, str]):
+        self.entries = entries
+        self._root: Dict = {}
+        for original in entries:
+            stems = _stems(original)
+            if not stems:
+                continue
+            node = self._root
+            for stem in stems:
+                node = node.setdefault(stem, {})
+            node.setdefault(None, []).append(original)
+
+    def _matches(self, stems: List[str]) -> Iterable[str]:
+        for start in range(len(stems)):
+            node = self._root
+            for stem in stems[start:]:
+                node = node.get(stem)
+                if node is None:
+                    break
+                yield from node.get(None, ())
+
+    def select(self, texts: Iterable[str]) -> Dict[str, str]:
+        found: Set[str] = set()
+        for text in texts:
+            found.update(self._matches(_stems(text)))
+        # Keep the dictionary order so the rendered prompt is stable for equal inputs
+        return {original: translated for original, translated in self.entries.items() if original in found}
+
+
+class PromptContext:
+    """Keyword index and translation examples of one category, built once per version."""
+
+    def __init__(self, category, version: int):
+        self.version = version
+        self.built_at = time.monotonic()
+
+        dictionary = KeywordTranslation.objects.filter(
+            Q(category=category) | Q(shared_across_categories=True)
+        ).order_by("pk").values_list("original", "translated")
+        self.keywords = KeywordIndex({original.lower(): translated.lower() for original, translated in dictionary})
+
+        examples = TranslationExample.objects.filter(
+            Q(source_language="pl") & Q(target_language="de") & (Q(category_id=category) | Q(category_id=None))
+        ).order_by("pk").values_list("source_text", "target_text", "description", "category_id")
+        self.examples: List[Tuple[Dict, Set[str], bool]] = [
+            (
+                {"source_text": source_text, "target_text": target_text, "description (why translated this way)": description},
+                set(_stems(source_text)),
+                category_id is not None,
+            )
+            for source_text, target_text, description, category_id in examples
+        ]
+
+    def select_examples(self, texts: Iterable[str], limit: int) -> List[Dict]:
+        """Category-specific examples first, then the ones sharing the most words with the texts."""
+        stems = set()
+        for text in texts:
+            stems.update(_stems(text))
+        ranked = sorted(
+            enumerate(self.examples),
+            key=lambda item: (not item[1][2], -len(item[1][1] & stems), item[0]),
+        )
+        return [example for _, (example, _, _) in ranked[:limit]]
+
+
+_lock = threading.Lock()
+_contexts: Dict[str, PromptContext] = {}
+
+
+def _shared_version() -> int:
+    # Kept in the Django cache: an edit only invalidates other workers' indexes when CACHES is a
+    # shared backend (Redis, Memcached). With the default per-process LocMemCache they go stale for
+    # up to KEYWORD_INDEX_TTL
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def _is_current(context: Optional[PromptContext], version: int) -> bool:
+    return (
+        context is not None
+        and context.version == version
+        and time.monotonic() - context.built_at < settings.KEYWORD_INDEX_TTL
+    )
+
+
+def get_prompt_context(category) -> PromptContext:
+    key = str(category)
+    version = _shared_version()
+    context = _contexts.get(key)
+    if _is_current(context, version):
+        return context
+
+    with _lock:
+        # Another thread may have rebuilt it, or an invalidation cleared it, meanwhile
+        context = _contexts.get(key)
+        if not _is_current(context, version):
+            logger.info(f"Building keyword index for category {category} (version {version})")
+            context = PromptContext(category, version)
+            _contexts[key] = context
+        return context
+
+
+def invalidate_prompt_contexts():
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    _contexts.clear()
+
+
+@receiver([post_save, post_delete], sender=KeywordTranslation)
+@receiver([post_save, post_delete], sender=TranslationExample)
+def _invalidate_on_dictionary_change(sender, **kwargs):
+    invalidate_prompt_contexts()
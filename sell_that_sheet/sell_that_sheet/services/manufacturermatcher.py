@@ -0,0 +1,91 @@
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+MATCH_THRESHOLD = 0.9
+
+
+def _trigrams(name: str) -> set:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ManufacturerMatcher:
+    """
+    Prebuilt index over the BaseLinker manufacturers list.
+
+    Exact (case-insensitive) names are resolved with a dict lookup. Otherwise only
+    manufacturers sharing trigrams with the name are considered, the best
+    ``max_candidates`` of them are scored with SequenceMatcher and the first one
+    whose ratio is strictly above ``threshold`` wins - the same rule as the old linear scan.
+    """
+
+    def __init__(self, manufacturers: List[Dict], threshold: float = MATCH_THRESHOLD,
+                 max_candidates: Optional[int] = None):
+        self.threshold = threshold
+        self.max_candidates = max_candidates or settings.MANUFACTURER_MATCH_MAX_CANDIDATES
+        self._names: List[str] = []
+        self._ids: List[int] = []
+        self._exact: Dict[str, int] = {}
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+        self._memo: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        for position, manufacturer in enumerate(manufacturers):
+            name = manufacturer['name'].lower()
+            self._names.append(name)
+            self._ids.append(manufacturer['manufacturer_id'])
+            self._exact.setdefault(name, manufacturer['manufacturer_id'])
+            for gram in _trigrams(name):
+                self._trigram_index[gram].append(position)
+
+    def _candidates(self, name: str) -> List[int]:
+        shared = defaultdict(int)
+        for gram in _trigrams(name):
+            for position in self._trigram_index.get(gram, ()):
+                shared[position] += 1
+        ranked = sorted(shared.items(), key=lambda item: (-item[1], item[0]))
+        # Score in list order so ties resolve like the linear scan did
+        return sorted(position for position, _ in ranked[:self.max_candidates])
+
+    def match(self, name: str) -> Optional[int]:
+        name = name.lower()
+        if name in self._exact:
+            return self._exact[name]
+        if name in self._memo:
+            return self._memo[name]
+
+        best_ratio = self.threshold
+        matched_id = None
+        for position in self._candidates(name):
+            matcher = SequenceMatcher(None, name, self._names[position])
+            # real_quick_ratio/quick_ratio are upper bounds of ratio, so they only skip hopeless candidates
+            if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                matched_id = self._ids[position]
+
+        if matched_id is not None:
+            with self._lock:
+                self._memo[name] = matched_id
+        return matched_id
+
+
+_matcher_lock = threading.Lock()
+_matcher: Optional[ManufacturerMatcher] = None
+_matcher_version: Optional[int] = None
+
+
+def get_manufacturer_matcher(manufacturers: List[Dict], version: int) -> ManufacturerMatcher:
+    """Return the shared matcher, rebuilding it when the cached manufacturers list changed."""
+    global _matcher, _matcher_version
+    with _matcher_lock:
+        if _matcher is None or _matcher_version != version:
+            _matcher = ManufacturerMatcher(manufacturers)
+            _matcher_version = version
+        return _matcher
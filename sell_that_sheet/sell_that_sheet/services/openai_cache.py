@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from django.db.models import F
+
+from ..models.openai_translation_cache import OpenAiTranslationCache
+
+logger = logging.getLogger(__name__)
+
+COMPLETION = "completion"
+PARAMETER = "parameter"
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+
+
+def normalize_text(text) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def make_cache_key(kind: str, model: str, instructions: str, payload) -> str:
+    instructions_hash = hashlib.sha256(instructions.encode()).hexdigest()
+    raw = json.dumps([kind, model, instructions_hash, payload], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _count(kind: str, hits: int, misses: int):
+    with _stats_lock:
+        _stats[f"{kind}_hits"] += hits
+        _stats[f"{kind}_misses"] += misses
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of this process since start."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def get_cached_responses(kind: str, keys: List[str]) -> Dict[str, Any]:
+    """Return ``{cache_key: response}`` for the keys already stored, in one query."""
+    if not keys:
+        return {}
+    found = dict(
+        OpenAiTranslationCache.objects.filter(cache_key__in=keys).values_list("cache_key", "response")
+    )
+    if found:
+        OpenAiTranslationCache.objects.filter(cache_key__in=found.keys()).update(hits=F("hits") + 1)
+    _count(kind, len(found), len(set(keys)) - len(found))
+    logger.info(f"OpenAI {kind} cache: {len(found)} hit(s), {len(set(keys)) - len(found)} miss(es)")
+    return found
+
+
+def get_cached_response(kind: str, key: str) -> Optional[Any]:
+    return get_cached_responses(kind, [key]).get(key)
+
+
+def store_responses(kind: str, model: str, entries: List[tuple]):
+    """Store ``(cache_key, request, response)`` entries, ignoring keys stored concurrently."""
+    OpenAiTranslationCache.objects.bulk_create(
+        [
+            OpenAiTranslationCache(cache_key=key, kind=kind, model=model, request=request, response=response)
+            for key, request, response in entries
+        ],
+        ignore_conflicts=True,
+    )
@@ -1,17 +1,74 @@
 import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from functools import cached_property
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from django.conf import settings
-from django.db.models import Q
 from openai import OpenAI
 
-from ..models.translation_example import TranslationExample
-from ..models.keyword_translation import KeywordTranslation
+from .keyword_index import get_prompt_context
+from .openai_cache import (
+    COMPLETION,
+    PARAMETER,
+    get_cached_response,
+    get_cached_responses,
+    make_cache_key,
+    normalize_text,
+    store_responses,
+)
+
+logger = logging.getLogger(__name__)
+
+_client_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_client_pid: Optional[int] = None
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return the per-process OpenAI client. Its underlying HTTP connection pool is
+    reused by every OpenAiService; the client is recreated after a fork.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=settings.OPENAI_REQUEST_TIMEOUT,
+                    max_retries=settings.OPENAI_MAX_RETRIES,
+                )
+                _client_pid = pid
+    return _client
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough upper bound for Polish/German text, good enough for packing batches
+    return len(text) // 3 + 1
+
+
+def chunk_by_budget(items: Sequence, size_of: Callable[[object], int], max_tokens: int, max_items: int) -> Iterable[List]:
+    """Split ``items`` into consecutive chunks whose summed size stays within ``max_tokens``."""
+    chunk, used = [], 0
+    for item in items:
+        size = size_of(item)
+        if chunk and (used + size > max_tokens or len(chunk) >= max_items):
+            yield chunk
+            chunk, used = [], 0
+        chunk.append(item)
+        used += size
+    if chunk:
+        yield chunk
+
 
 class OpenAiService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.translation_assistant_id = settings.OPENAI_TRANSLATION_ASSISTANT_ID
-        self.translation_assistant = self.client.beta.assistants.retrieve(assistant_id=self.translation_assistant_id)
         self.instructions = """
         Translate product auction titles and/or descriptions from Polish to German, focusing on common terms used in German auction markets for aftermarket car parts.
 
@@ -102,6 +159,28 @@ example output:
 ]
 """
 
+    batch_completion_instructions = """
+
+# Batch mode
+The user message is a JSON object {"items": [{"id": ..., "title": ..., "description": ...}, ...]}.
+Translate every item independently, following all the rules above.
+Respond with a JSON object {"items": [{"id": ..., "title": ..., "description": ...}, ...]} containing
+every input id exactly once.
+"""
+
+    keyed_parameter_instructions = """
+
+# Keyed mode
+The user message is a JSON object {"pairs": {"<id>": [parameter, value], ...}}.
+Respond with a JSON object {"pairs": {"<id>": [translated parameter, translated value], ...}} that uses
+exactly the ids of the input, with one translated pair per id.
+"""
+
+    @cached_property
+    def translation_assistant(self):
+        # Only the assistants API needs this, so it is not fetched up front
+        return self.client.beta.assistants.retrieve(assistant_id=self.translation_assistant_id)
+
     def translate_assistant(self, title=None, description=None, category=None):
         thread = thread = self.client.beta.threads.create()
         message = self.client.beta.threads.messages.create(
@@ -127,16 +206,36 @@ example output:
         else:
             print(run.status)
 
-    def translate_completion(self, title=None, description=None, category=None):
-        translation_dictionary = KeywordTranslation.objects.filter(Q(category=category) | Q(shared_across_categories=True)).values_list('original', 'translated')
-        translation_dictionary = {original.lower(): translation.lower() for original, translation in translation_dictionary}
-
-        translation_examples_description = TranslationExample.objects.filter(Q(source_language='pl') & Q(target_language='de') & (Q(category_id=category) | Q(category_id=None))).values_list('source_text', 'target_text', 'description')
-        translation_examples_description = [{"source_text": source_text, "target_text": target_text, "description (why translated this way)": description} for source_text, target_text, description in translation_examples_description]
+    def _completion_instructions(self, category=None, texts=()):
+        """Render the instructions with only the dictionary entries and examples relevant to ``texts``."""
+        context = get_prompt_context(category)
+        translation_dictionary = context.keywords.select(texts)
+        translation_examples_description = context.select_examples(texts, settings.OPENAI_MAX_TRANSLATION_EXAMPLES)
 
         instructions = self.instructions.format(translation_dictionary=json.dumps(translation_dictionary, indent=2), translation_examples_description=json.dumps(translation_examples_description, indent=2))
+        logger.info(
+            f"Translation prompt for category {category}: {len(instructions)} chars (~{estimate_tokens(instructions)} tokens), "
+            f"{len(translation_dictionary)}/{len(context.keywords.entries)} dictionary entries, "
+            f"{len(translation_examples_description)}/{len(context.examples)} examples"
+        )
+        return instructions
+
+    def _completion_request(self, instructions, title, description):
+        # The rendered instructions embed the dictionary and examples, so editing them changes the key
+        request = {"title": normalize_text(title), "description": normalize_text(description)}
+        return make_cache_key(COMPLETION, self.default_model, instructions, request), request
+
+    def _parameter_cache_key(self, name, value):
+        return make_cache_key(PARAMETER, self.default_model, self.parameter_translation_instructions,
+                              [normalize_text(name), normalize_text(value)])
 
-        print(f"Instructions: {instructions}")
+    def translate_completion(self, title=None, description=None, category=None):
+        instructions = self._completion_instructions(category, [title, description])
+
+        cache_key, request = self._completion_request(instructions, title, description)
+        cached = get_cached_response(COMPLETION, cache_key)
+        if cached is not None:
+            return cached
 
         completion = self.client.chat.completions.create(
             model=self.default_model,
@@ -146,15 +245,181 @@ example output:
             ],
         )
         response_translation = json.loads(completion.choices[0].message.content)
+        store_responses(COMPLETION, self.default_model, [(cache_key, json.dumps(request, ensure_ascii=False), response_translation)])
         return response_translation
 
     def translate_parameters(self, parameters):
+        """
+        Translate parameter/value pairs. Each pair is cached separately, so only pairs
+        that were never translated before are sent to the model.
+        """
+        keys = [self._parameter_cache_key(name, value) for name, value in parameters.items()]
+        cached = get_cached_responses(PARAMETER, keys)
+
+        response_translation = {}
+        missing, missing_keys = {}, []
+        for (name, value), key in zip(parameters.items(), keys):
+            if key in cached:
+                translated_name, translated_value = cached[key]
+                response_translation[translated_name] = translated_value
+            else:
+                missing[name] = value
+                missing_keys.append(key)
+
+        if not missing:
+            return response_translation
+
+        pending = list(zip(missing_keys, missing.items()))
+        answers = self._translate_pairs([pair for _, pair in pending])
+        # A pair the answer could not be matched to is retried on its own rather than guessed
+        for position, (_, pair) in enumerate(pending):
+            if position not in answers:
+                retried = self._translate_pairs([pair])
+                if 0 in retried:
+                    answers[position] = retried[0]
+
+        store_responses(PARAMETER, self.default_model, [
+            (key, json.dumps(list(pair), ensure_ascii=False), list(answers[position]))
+            for position, (key, pair) in enumerate(pending) if position in answers
+        ])
+        response_translation.update(answers[position] for position in sorted(answers))
+        return response_translation
+
+    def _translate_pairs(self, pairs: List[Tuple[str, str]]) -> Dict[int, Tuple[str, str]]:
+        """
+        Translate parameter/value pairs sent under their position as id. Returns the answers by
+        position; answers whose id does not exactly match a requested one, or that are not a pair,
+        are dropped, so a translation is never attributed to another pair.
+        """
+        response = self._batch_request(
+            self.parameter_translation_instructions + self.keyed_parameter_instructions,
+            {"pairs": {str(position): list(pair) for position, pair in enumerate(pairs)}},
+        )
+        answers = response.get("pairs") if isinstance(response, dict) else None
+        if not isinstance(answers, dict):
+            logger.warning(f"Parameter translation returned no pairs object for {len(pairs)} pair(s)")
+            return {}
+
+        matched = {}
+        for position in range(len(pairs)):
+            answer = answers.get(str(position))
+            if isinstance(answer, list) and len(answer) == 2 and all(isinstance(part, (str, int, float)) for part in answer):
+                matched[position] = (str(answer[0]), str(answer[1]))
+        if len(matched) != len(pairs):
+            logger.warning(f"Parameter translation matched {len(matched)} of {len(pairs)} pair(s)")
+        return matched
+
+    def _batch_request(self, instructions, payload) -> Dict:
         completion = self.client.chat.completions.create(
             model=self.default_model,
+            response_format={"type": "json_object"},
             messages=[
-                {"role": "system", "content": self.parameter_translation_instructions},
-                {"role": "user", "content": json.dumps(parameters).lower()},
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": json.dumps(payload, ensure_ascii=False).lower()},
             ],
         )
-        response_translation = json.loads(completion.choices[0].message.content)
-        return response_translation
\ No newline at end of file
+        return json.loads(completion.choices[0].message.content)
+
+    def translate_completions_batch(self, items: List[Tuple[str, str, Optional[int]]]) -> List[Optional[Dict]]:
+        """
+        Translate many ``(title, description, category)`` items with as few requests as possible.
+        Items of the same category share the instructions, so they are packed into requests bounded
+        by OPENAI_BATCH_MAX_TOKENS/OPENAI_BATCH_MAX_ITEMS. Results are stored under the same cache
+        keys as translate_completion; items the batch response did not answer are translated one by
+        one. Returns translations in input order, None where even that failed.
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        by_category = defaultdict(list)
+        for position, (_, _, category) in enumerate(items):
+            by_category[category].append(position)
+
+        for category, positions in by_category.items():
+            # Keys use the per-item instructions translate_completion would render for the same text
+            prepared = {
+                position: self._completion_request(self._completion_instructions(category, items[position][:2]), *items[position][:2])
+                for position in positions
+            }
+            cached = get_cached_responses(COMPLETION, [key for key, _ in prepared.values()])
+
+            # Identical texts are translated once
+            pending = {}
+            for position in positions:
+                key, request = prepared[position]
+                if key in cached:
+                    results[position] = cached[key]
+                else:
+                    pending.setdefault(key, (request, []))[1].append(position)
+
+            unanswered = []
+            chunks = chunk_by_budget(
+                list(pending.items()),
+                lambda entry: estimate_tokens(entry[1][0]["title"] + entry[1][0]["description"]),
+                settings.OPENAI_BATCH_MAX_TOKENS,
+                settings.OPENAI_BATCH_MAX_ITEMS,
+            )
+            for chunk in chunks:
+                payload = {"items": [{"id": index, **request} for index, (_, (request, _)) in enumerate(chunk)]}
+                texts = [text for _, (request, _) in chunk for text in (request["title"], request["description"])]
+                try:
+                    instructions = self._completion_instructions(category, texts)
+                    response = self._batch_request(instructions + self.batch_completion_instructions, payload)
+                    answers = {str(item.get("id")): item for item in response.get("items", []) if isinstance(item, dict)}
+                except Exception as e:
+                    logger.warning(f"Batch translation of {len(chunk)} item(s) failed, falling back to single requests: {e}")
+                    answers = {}
+
+                entries = []
+                for index, (key, (request, waiting)) in enumerate(chunk):
+                    answer = answers.get(str(index))
+                    if not answer or not answer.get("title") and request["title"]:
+                        unanswered.extend(waiting)
+                        continue
+                    translation = {"title": answer.get("title", ""), "description": answer.get("description", "")}
+                    entries.append((key, json.dumps(request, ensure_ascii=False), translation))
+                    for position in waiting:
+                        results[position] = translation
+                store_responses(COMPLETION, self.default_model, entries)
+
+            for position in unanswered:
+                title, description, _ = items[position]
+                try:
+                    results[position] = self.translate_completion(title=title, description=description, category=category)
+                except Exception as e:
+                    logger.warning(f"Translation of '{title}' failed: {e}")
+
+        return results
+
+    def translate_parameter_pairs_batch(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[str, str]]:
+        """
+        Translate parameter/value pairs collected from many products in requests bounded by the
+        batch budget. Each answered pair is cached like in translate_parameters, so the
+        per-product calls afterwards are served from the cache; pairs whose answer cannot be
+        matched by id are left for those calls to translate.
+        """
+        keys = {}
+        for name, value in pairs:
+            keys.setdefault(self._parameter_cache_key(name, value), (name, value))
+        cached = get_cached_responses(PARAMETER, list(keys))
+        translated = {keys[key]: tuple(response) for key, response in cached.items()}
+
+        pending = [(key, pair) for key, pair in keys.items() if key not in cached]
+        chunks = chunk_by_budget(
+            pending,
+            lambda entry: estimate_tokens(f"{entry[1][0]}{entry[1][1]}") + 4,
+            settings.OPENAI_BATCH_MAX_TOKENS,
+            settings.OPENAI_BATCH_MAX_PAIRS,
+        )
+        for chunk in chunks:
+            try:
+                answers = self._translate_pairs([pair for _, pair in chunk])
+            except Exception as e:
+                logger.warning(f"Batch translation of {len(chunk)} parameter(s) failed: {e}")
+                continue
+
+            store_responses(PARAMETER, self.default_model, [
+                (key, json.dumps(list(pair), ensure_ascii=False), list(answers[position]))
+                for position, (key, pair) in enumerate(chunk) if position in answers
+            ])
+            translated.update({pair: answers[position] for position, (_, pair) in enumerate(chunk) if position in answers})
+
+        return translated
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from django.conf import settings
+
+from .utils import parse_photos, limit_photo_size
+
+logger = logging.getLogger(__name__)
+
+# Bump when parse_photos/encode_photo output changes for the same inputs
+CACHE_FORMAT_VERSION = 1
+# Seconds during which a .tmp file is assumed to belong to a writer that is about to rename it
+TMP_GRACE_PERIOD = 10 * 60
+
+_prune_lock = threading.Lock()
+_last_prune = None
+
+
+def _cache_key(photo_paths: List[str], max_photos: int) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "version": CACHE_FORMAT_VERSION,
+        "max_photos": max_photos,
+        "max_dimension": settings.PHOTO_MAX_DIMENSION,
+        "max_bytes": settings.PHOTO_MAX_BYTES,
+        "quality": settings.PHOTO_JPEG_QUALITY,
+        "min_quality": settings.PHOTO_JPEG_MIN_QUALITY,
+        "max_iterations": settings.PHOTO_ENCODE_MAX_ITERATIONS,
+    }, sort_keys=True).encode())
+    # Order matters: it decides numbering and which photos end up in collages
+    for position, path in enumerate(photo_paths):
+        stat = os.stat(path)
+        digest.update(f"{position}|{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(settings.PHOTO_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def _read(key: str) -> Optional[List[str]]:
+    path = _cache_path(key)
+    try:
+        with open(path, "r") as fh:
+            payload = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    # Touch the entry so eviction drops the least recently used ones first. Only a hint: another
+    # worker may have pruned the entry since it was read, and the payload is still valid.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return payload
+
+
+def _write(key: str, photos: List[str]):
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            json.dump(photos, fh)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def prune_photo_cache(max_bytes: Optional[int] = None) -> int:
+    """
+    Delete least recently used entries until the cache fits in ``max_bytes``
+    (PHOTO_CACHE_MAX_BYTES by default). Returns the number of removed entries.
+    Temporary files younger than TMP_GRACE_PERIOD are left to the writers renaming them.
+    """
+    max_bytes = settings.PHOTO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    tmp_cutoff = time.time() - TMP_GRACE_PERIOD
+    for root, _, files in os.walk(settings.PHOTO_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if name.endswith(".tmp") and stat.st_mtime > tmp_cutoff:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def maybe_prune_photo_cache():
+    """
+    Prune the cache at most once every PHOTO_CACHE_PRUNE_INTERVAL seconds per process, as pruning
+    walks the whole cache directory. With the interval set to 0 only the prune_photo_cache command prunes.
+    """
+    global _last_prune
+    interval = settings.PHOTO_CACHE_PRUNE_INTERVAL
+    if interval <= 0:
+        return
+    with _prune_lock:
+        now = time.monotonic()
+        if _last_prune is not None and now - _last_prune < interval:
+            return
+        _last_prune = now
+    removed = prune_photo_cache()
+    if removed:
+        logger.info(f"Evicted {removed} photosets from the photo cache")
+
+
+def get_listing_photos(photo_paths: List[str], max_photos: int) -> List[str]:
+    """
+    parse_photos + limit_photo_size for a photoset, served from the on-disk cache
+    when the same files were already processed with the same settings.
+    """
+    if not settings.PHOTO_CACHE_MAX_BYTES:
+        return limit_photo_size(parse_photos(photo_paths, max_photos))
+
+    key = _cache_key(photo_paths, max_photos)
+    cached = _read(key)
+    if cached is not None:
+        logger.info(f"Photo cache hit for {len(photo_paths)} photos ({key[:12]})")
+        return cached
+
+    photos = limit_photo_size(parse_photos(photo_paths, max_photos))
+    try:
+        _write(key, photos)
+        maybe_prune_photo_cache()
+    except OSError as e:
+        logger.warning(f"Failed to store processed photos in cache: {e}")
+    return photos
@@ -0,0 +1,69 @@
+import csv
+import json
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from openpyxl import Workbook
+
+
+@contextmanager
+def spooled_rows(rows: Iterable[Dict]) -> Iterator[Tuple[List[str], Callable[[], Iterator[Dict]]]]:
+    """
+    Consume ``rows`` once, spilling them to a temporary JSON-lines file while collecting
+    the union of their keys (in first-seen order). Yields the headers and a function
+    replaying the rows from disk, so only one row is in memory at a time.
+    """
+    headers: Dict[str, None] = {}
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for row in rows:
+            headers.update(dict.fromkeys(row))
+            spool.write(json.dumps(row, ensure_ascii=False, default=str))
+            spool.write("\n")
+
+        def replay() -> Iterator[Dict]:
+            spool.seek(0)
+            for line in spool:
+                yield json.loads(line)
+
+        yield list(headers), replay
+
+
+def write_xlsx(rows: Iterable[Dict], filename: str):
+    """Write rows to an XLSX file with a column for every key any row has."""
+    with spooled_rows(rows) as (headers, replay):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Sheet")
+        if headers:
+            ws.append(headers)
+            for r in replay():
+                ws.append([r.get(h, '') for h in headers])
+        wb.save(filename)
+
+
+def write_csv(rows: Iterable[Dict], filename: str):
+    """Write rows to a CSV file with a column for every key any row has; nothing is written without rows."""
+    with spooled_rows(rows) as (headers, replay):
+        if not headers:
+            return
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+            for r in replay():
+                writer.writerow(r)
+
+
+def tee_to_json(rows: Iterable[Dict], filename: str) -> Iterator[Dict]:
+    """
+    Pass rows through while writing them to a JSON list, formatted like
+    ``json.dump(list(rows), f, indent=4)``. The file is complete once the rows are exhausted.
+    """
+    with open(filename, 'w') as f:
+        f.write('[')
+        empty = True
+        for row in rows:
+            f.write('\n' if empty else ',\n')
+            f.write('\n'.join('    ' + line for line in json.dumps(row, indent=4).split('\n')))
+            empty = False
+            yield row
+        f.write(']' if empty else '\n]')
@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models.category_tag import CategoryTag
+from ..models.tag import Tag
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "tag_engine:version"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton: finds which of many patterns occur in a text in a single pass.
+    Matching is exact, so callers upper-case both the patterns and the text.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._always: List[int] = []
+
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                # "" in text is always true
+                self._always.append(index)
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text: str) -> Set[int]:
+        """Return the indexes of the patterns occurring in ``text``."""
+        found = set(self._always)
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class TagEngine:
+    """
+    Custom tags and category tags of one language, loaded once and matched with a
+    KeywordAutomaton instead of querying and scanning every Tag on each prepare_tags call.
+    """
+
+    def __init__(self, language: str, version: int):
+        self.language = language
+        self.version = version
+        self.built_at = time.monotonic()
+
+        # Same queries (and row order) as get_custom_tags/get_category_tags
+        self.custom_tags: List[Tuple[str, str]] = list(
+            Tag.objects.filter(language=language).values_list("key", "value")
+        )
+        self.category_tags: Dict[int, List[str]] = defaultdict(list)
+        for category_id, tags in CategoryTag.objects.filter(language=language).values_list("category_id", "tags"):
+            self.category_tags[category_id].append(tags)
+
+        self._keys = [key.upper() for key, _ in self.custom_tags]
+        self._automaton = KeywordAutomaton(self._keys)
+
+    def match_custom_tags(self, name: str, tags: str) -> List[str]:
+        """Values of the custom tags whose key occurs in the name or tags, in Tag order."""
+        name_upper = name.upper()
+        found = self._automaton.search(name_upper)
+        # The old scan only looked at tags for keys missing from the name, so tags may be None then
+        if len(found) < len(self._keys):
+            found |= self._automaton.search(tags.upper())
+
+        values = []
+        for index in sorted(found):
+            key = self._keys[index]
+            if key == 'LIFT' and key in name_upper:
+                if not 'LIFT ' in name_upper or 'PRZED LIFT' in name_upper:
+                    continue
+            values.append(str(self.custom_tags[index][1]))
+        return values
+
+    def get_category_tags(self, category_id: int) -> Optional[List[str]]:
+        return self.category_tags.get(category_id) or None
+
+
+_lock = threading.Lock()
+_engines: Dict[str, TagEngine] = {}
+
+
+def _shared_version() -> int:
+    # Kept in the Django cache: a tag edit only invalidates other workers' engines when CACHES is a
+    # shared backend (Redis, Memcached). With the default per-process LocMemCache they go stale for
+    # up to TAG_ENGINE_TTL
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def _is_current(engine: Optional[TagEngine], version: int) -> bool:
+    return (
+        engine is not None
+        and engine.version == version
+        and time.monotonic() - engine.built_at < settings.TAG_ENGINE_TTL
+    )
+
+
+def get_tag_engine(language: str = 'pl') -> TagEngine:
+    version = _shared_version()
+    engine = _engines.get(language)
+    if _is_current(engine, version):
+        return engine
+
+    with _lock:
+        # Another thread may have rebuilt it, or an invalidation cleared it, meanwhile
+        engine = _engines.get(language)
+        if not _is_current(engine, version):
+            logger.info(f"Building tag engine for '{language}' (version {version})")
+            engine = TagEngine(language, version)
+            _engines[language] = engine
+        return engine
+
+
+def invalidate_tag_engines():
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    _engines.clear()
+
+
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=CategoryTag)
+def _invalidate_on_tag_change(sender, **kwargs):
+    invalidate_tag_engines()
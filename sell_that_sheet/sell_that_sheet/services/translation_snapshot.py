@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models.parameter import Parameter, AuctionParameter
+from ..models.translations import ParameterTranslation, AuctionParameterTranslation
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "translation_snapshot:version"
+
+
+class TranslationSnapshot:
+    """
+    Immutable, process-local copy of all ParameterTranslation and
+    AuctionParameterTranslation rows, indexed for the feature translation hot path.
+    When several translations exist for the same key the one with the lowest pk wins,
+    like the previous ``.first()`` lookups.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.parameter_by_id: Dict[int, str] = {}
+        self.parameter_by_name: Dict[str, str] = {}
+        self.value_by_name: Dict[Tuple[str, str], str] = {}
+        self.value_by_allegro_id: Dict[Tuple[str, str], str] = {}
+        self.parameter_rows: List[Dict] = []
+        self.value_rows: List[Dict] = []
+
+        for parameter_id, name, translation in (
+            ParameterTranslation.objects.order_by("pk")
+            .values_list("parameter_id", "parameter__name", "translation")
+        ):
+            self.parameter_by_id.setdefault(parameter_id, translation)
+            self.parameter_by_name.setdefault(name, translation)
+            self.parameter_rows.append({"param_id": parameter_id, "translation": translation})
+
+        for parameter_id, name, allegro_id, value_name, translation in (
+            AuctionParameterTranslation.objects.order_by("pk")
+            .values_list(
+                "auction_parameter__parameter_id",
+                "auction_parameter__parameter__name",
+                "auction_parameter__parameter__allegro_id",
+                "auction_parameter__value_name",
+                "translation",
+            )
+        ):
+            self.value_by_name.setdefault((name, value_name), translation)
+            self.value_by_allegro_id.setdefault((allegro_id, value_name), translation)
+            self.value_rows.append({"param_id": parameter_id, "value_name": value_name, "translation": translation})
+
+
+_lock = threading.Lock()
+_snapshot: Optional[TranslationSnapshot] = None
+
+
+def _shared_version() -> int:
+    # Kept in the Django cache: a save only invalidates other workers' snapshots when CACHES is a
+    # shared backend (Redis, Memcached). With the default per-process LocMemCache they go stale for
+    # up to TRANSLATION_SNAPSHOT_TTL
+    return cache.get(VERSION_CACHE_KEY, 0)
+
+
+def get_translation_snapshot() -> TranslationSnapshot:
+    global _snapshot
+    version = _shared_version()
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.version == version
+        and time.monotonic() - snapshot.built_at < settings.TRANSLATION_SNAPSHOT_TTL
+    ):
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot is snapshot:
+            logger.info(f"Building translation snapshot (version {version})")
+            _snapshot = TranslationSnapshot(version)
+        return _snapshot
+
+
+def invalidate_translation_snapshot():
+    global _snapshot
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    _snapshot = None
+
+
+@receiver([post_save, post_delete], sender=ParameterTranslation)
+@receiver([post_save, post_delete], sender=AuctionParameterTranslation)
+def _invalidate_on_translation_change(sender, **kwargs):
+    invalidate_translation_snapshot()
+
+
+@receiver(post_save, sender=Parameter)
+def _invalidate_on_parameter_rename(sender, created=False, **kwargs):
+    # Snapshot keys use parameter names; brand new parameters have no translations yet
+    if not created:
+        invalidate_translation_snapshot()
+
+
+@receiver(post_save, sender=AuctionParameter)
+def _invalidate_on_auction_parameter_change(sender, created=False, **kwargs):
+    # Value translations are keyed by value_name; new auction parameters have no translations yet
+    if not created:
+        invalidate_translation_snapshot()
+
+
+@receiver(post_delete, sender=AuctionParameter)
+def _invalidate_on_auction_parameter_delete(sender, **kwargs):
+    invalidate_translation_snapshot()
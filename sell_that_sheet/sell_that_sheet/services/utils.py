@@ -5,7 +5,10 @@ import base64
 import shutil
 import glob
 import logging
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import List, NamedTuple, Tuple
 import glob
 import math
 from pprint import pprint
@@ -51,40 +54,77 @@ def copy_images_convert_to_jpg(dir1, dir2):
 
 
 
-def limit_photo_size(photos):
-    MAX_SIZE_MB = 2
-    max_size_bytes = MAX_SIZE_MB * 1024 * 1024  # Convert MB to bytes
-    limited_photos = []
-
-    for img in photos:
-        defimg = img.copy()
-        # set format to jpg
-        img_format = 'JPEG'
-        img = img.convert('RGB')  # Convert image to RGB format for consistency
-        img_bytes = BytesIO()
-        img.save(img_bytes, format=img_format)
-        img_bytes.seek(0)
-
-        if len(img_bytes.getvalue()) <= max_size_bytes:
-            # limited_photos.append(img_bytes.getvalue())
-            encoded_string = base64.b64encode(img_bytes.getvalue()).decode('utf-8')
-            # save image to text file
-
-            # with open("test.txt", "w") as f:
-            #     f.write(encoded_string)
-
-            limited_photos.append("data:"+str(encoded_string))
-        else:
-            # If the image exceeds the size limit, resize it while maintaining aspect ratio
-            img.thumbnail((800, 800))  # Resize to a maximum of 800x800 pixels
-            resized_img_bytes = BytesIO()
-            # img.save(resized_img_bytes, format=img_format)
-            resized_img_bytes.seek(0)
-            encoded_string = base64.b64encode(resized_img_bytes.getvalue()).decode('utf-8')
-            limited_photos.append("data:"+str(encoded_string))
-            # limited_photos.append(str(resized_img_bytes.getvalue()))
+class EncodedPhoto(NamedTuple):
+    data: str  # "data:" + base64 JPEG, as expected by BaseLinker
+    size: int  # JPEG size in bytes
+    quality: int
+    dimensions: Tuple[int, int]
+
+
+def _encode_jpeg(img: Image, quality: int) -> BytesIO:
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer
+
+
+def encode_photo(img: Image, max_bytes=None, max_quality=None, min_quality=None, max_iterations=None) -> EncodedPhoto:
+    """
+    Encode an image to JPEG within ``max_bytes``.
+    Tries ``max_quality`` first, then binary-searches the highest quality that fits
+    (at most ``max_iterations`` extra encodes) and only downscales when even
+    ``min_quality`` is too large.
+    """
+    max_bytes = max_bytes or settings.PHOTO_MAX_BYTES
+    max_quality = max_quality or settings.PHOTO_JPEG_QUALITY
+    min_quality = min_quality or settings.PHOTO_JPEG_MIN_QUALITY
+    max_iterations = max_iterations or settings.PHOTO_ENCODE_MAX_ITERATIONS
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    while True:
+        quality = max_quality
+        best = _encode_jpeg(img, quality)
+        if best.getbuffer().nbytes > max_bytes:
+            floor = _encode_jpeg(img, min_quality)
+            floor_size = floor.getbuffer().nbytes
+            if floor_size > max_bytes:
+                # Not even min_quality fits, shrink by the missing ratio (with some headroom) and retry
+                scale = min(0.9, (max_bytes / floor_size) ** 0.5 * 0.95)
+                img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.LANCZOS)
+                continue
+
+            best, quality = floor, min_quality
+            low, high = min_quality + 1, max_quality - 1
+            for _ in range(max_iterations):
+                if low > high:
+                    break
+                mid = (low + high) // 2
+                candidate = _encode_jpeg(img, mid)
+                if candidate.getbuffer().nbytes <= max_bytes:
+                    best, quality, low = candidate, mid, mid + 1
+                else:
+                    high = mid - 1
+
+        # Encode straight from the buffer view, without an intermediate bytes copy. The data URI
+        # is not streamed: it has to end up as one string in the addInventoryProduct JSON body.
+        with best.getbuffer() as view:
+            size = view.nbytes
+            encoded = base64.b64encode(view).decode('ascii')
+        return EncodedPhoto(data="data:" + encoded, size=size, quality=quality, dimensions=img.size)
+
+
+def encode_photos(photos) -> List[EncodedPhoto]:
+    photos = list(photos)
+    pool = _get_photo_pool()
+    encoded = list(pool.map(encode_photo, photos)) if pool is not None and len(photos) > 1 else list(map(encode_photo, photos))
+    for i, photo in enumerate(encoded):
+        logger.info(f"Photo {i}: {photo.dimensions[0]}x{photo.dimensions[1]}, quality {photo.quality}, {photo.size} bytes")
+    return encoded
+
 
-    return limited_photos
+def limit_photo_size(photos):
+    return [photo.data for photo in encode_photos(photos)]
 
 
 def chunks(lst, n):
@@ -180,9 +220,45 @@ def merge_photos(photos):
 
     return merged
 
-def add_numeration_on_image(img: Image, num):
-    font = ImageFont.truetype(os.path.join(settings.STATIC_ROOT, 'fonts/Roboto-Black.ttf'), 60)
-    photo = Image.open(img).convert("RGB")
+NUMERATION_FONT_SIZE = 60
+
+# FreeType faces aren't safe to share between threads, so each pool worker loads its own font once
+_numeration_fonts = threading.local()
+_photo_pool = None
+_photo_pool_lock = threading.Lock()
+
+
+def get_numeration_font_path():
+    return os.path.join(settings.STATIC_ROOT, 'fonts/Roboto-Black.ttf')
+
+
+def _load_numeration_font(font_path):
+    fonts = _numeration_fonts.__dict__
+    font = fonts.get(font_path)
+    if font is None:
+        font = fonts[font_path] = ImageFont.truetype(font_path, NUMERATION_FONT_SIZE)
+    return font
+
+
+def open_photo(img, max_dimension=None) -> Image:
+    """
+    Open an image as RGB. For JPEGs with ``max_dimension`` set, the decoder is asked
+    to scale down while decoding (draft mode) so full-resolution pixels are never produced.
+    """
+    photo = Image.open(img)
+    if max_dimension and max(photo.size) > max_dimension:
+        if photo.format == 'JPEG':
+            scale = max_dimension / max(photo.size)
+            photo.draft('RGB', (int(photo.size[0] * scale), int(photo.size[1] * scale)))
+        photo = photo.convert("RGB")
+        photo.thumbnail((max_dimension, max_dimension))
+        return photo
+    return photo.convert("RGB")
+
+
+def add_numeration_on_image(img: Image, num, max_dimension=None):
+    font = _load_numeration_font(get_numeration_font_path())
+    photo = open_photo(img, max_dimension)
 
     offset = 10
     if num != 0:
@@ -191,13 +267,36 @@ def add_numeration_on_image(img: Image, num):
 
     return photo
 
+
+def _get_photo_pool():
+    # Pillow releases the GIL while decoding, resizing and encoding, so threads run that work
+    # in parallel without pickling full-resolution images between processes
+    global _photo_pool
+    if settings.PHOTO_PROCESSING_WORKERS <= 1:
+        return None
+    with _photo_pool_lock:
+        if _photo_pool is None:
+            _photo_pool = ThreadPoolExecutor(
+                max_workers=settings.PHOTO_PROCESSING_WORKERS, thread_name_prefix="photos"
+            )
+        return _photo_pool
+
+
+def numerate_photos(image_set, max_dimension=None):
+    image_set = list(image_set)
+    args = (image_set, range(len(image_set)), repeat(max_dimension))
+
+    pool = _get_photo_pool()
+    if pool is not None and len(image_set) > 1:
+        return list(pool.map(add_numeration_on_image, *args))
+    return list(map(add_numeration_on_image, *args))
+
+
 def parse_photos(image_set, max_photos=12):
     MAX_PHOTOS = max_photos
     PACK_SIZE = 4
 
-    numerated = []
-    for i, photo in enumerate(image_set):
-        numerated.append(add_numeration_on_image(photo, i))
+    numerated = numerate_photos(image_set, settings.PHOTO_MAX_DIMENSION)
 
     reserved = math.ceil((len(image_set) - MAX_PHOTOS) / (PACK_SIZE - 1))
     to_merge = numerated[abs(MAX_PHOTOS - reserved):]
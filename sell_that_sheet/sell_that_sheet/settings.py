@@ -193,3 +193,89 @@ CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/
 CELERY_RESULT_BACKEND = os.environ.get(
     "CELERY_RESULT_BACKEND", "redis://localhost:6379/0"
 )
+
+# BaseLinker HTTP client
+BASELINKER_API_URL = os.environ.get(
+    "BASELINKER_API_URL", "https://api.baselinker.com/connector.php"
+)
+BASELINKER_POOL_SIZE = int(os.environ.get("BASELINKER_POOL_SIZE", 10))
+BASELINKER_CONNECT_TIMEOUT = float(os.environ.get("BASELINKER_CONNECT_TIMEOUT", 5))
+BASELINKER_READ_TIMEOUT = float(os.environ.get("BASELINKER_READ_TIMEOUT", 60))
+BASELINKER_MAX_RETRIES = int(os.environ.get("BASELINKER_MAX_RETRIES", 3))
+BASELINKER_RETRY_BACKOFF = float(os.environ.get("BASELINKER_RETRY_BACKOFF", 2))
+BASELINKER_RATE_LIMIT_ERROR_CODES = os.environ.get(
+    "BASELINKER_RATE_LIMIT_ERROR_CODES", "ERROR_BLOCKED,ERROR_LIMIT_EXCEEDED"
+).split(",")
+BASELINKER_CATALOGUE_TTL = int(os.environ.get("BASELINKER_CATALOGUE_TTL", 600))
+# Optional Django cache alias used to share the categories/manufacturers lists between workers
+BASELINKER_CATALOGUE_CACHE_ALIAS = os.environ.get("BASELINKER_CATALOGUE_CACHE_ALIAS")
+# Number of trigram-ranked manufacturers scored with SequenceMatcher per lookup
+MANUFACTURER_MATCH_MAX_CANDIDATES = int(os.environ.get("MANUFACTURER_MATCH_MAX_CANDIDATES", 50))
+CATEGORY_PATH_CACHE_SIZE = int(os.environ.get("CATEGORY_PATH_CACHE_SIZE", 2048))
+# Auction-set upload pipeline
+BASELINKER_PREPARE_WORKERS = int(os.environ.get("BASELINKER_PREPARE_WORKERS", 4))
+BASELINKER_UPLOAD_WORKERS = int(os.environ.get("BASELINKER_UPLOAD_WORKERS", 2))
+BASELINKER_REQUESTS_PER_MINUTE = int(os.environ.get("BASELINKER_REQUESTS_PER_MINUTE", 90))
+
+# Listing photo processing
+PHOTO_PROCESSING_WORKERS = int(os.environ.get("PHOTO_PROCESSING_WORKERS", os.cpu_count() or 1))
+# Photos are decoded/downscaled to fit this size before numbering; 0 keeps the original resolution
+PHOTO_MAX_DIMENSION = int(os.environ.get("PHOTO_MAX_DIMENSION", 2560))
+PHOTO_MAX_BYTES = int(os.environ.get("PHOTO_MAX_BYTES", 2 * 1024 * 1024))
+PHOTO_JPEG_QUALITY = int(os.environ.get("PHOTO_JPEG_QUALITY", 75))
+PHOTO_JPEG_MIN_QUALITY = int(os.environ.get("PHOTO_JPEG_MIN_QUALITY", 40))
+PHOTO_ENCODE_MAX_ITERATIONS = int(os.environ.get("PHOTO_ENCODE_MAX_ITERATIONS", 5))
+# On-disk cache of processed (numbered, collaged, encoded) photosets; 0 disables it
+PHOTO_CACHE_DIR = os.environ.get("PHOTO_CACHE_DIR", os.path.join(BASE_DIR, "photo_cache"))
+PHOTO_CACHE_MAX_BYTES = int(os.environ.get("PHOTO_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+# Minimum seconds between cache prunes after misses; 0 leaves pruning to the prune_photo_cache command
+PHOTO_CACHE_PRUNE_INTERVAL = int(os.environ.get("PHOTO_CACHE_PRUNE_INTERVAL", 300))
+
+# Upper bound (seconds) on how long a worker keeps its in-memory translation snapshot
+TRANSLATION_SNAPSHOT_TTL = int(os.environ.get("TRANSLATION_SNAPSHOT_TTL", 300))
+
+# OpenAI client: per-request timeout (seconds) and retries done by the SDK
+OPENAI_REQUEST_TIMEOUT = float(os.environ.get("OPENAI_REQUEST_TIMEOUT", 60))
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", 2))
+
+# Batched OpenAI translation: estimated input tokens and entries packed into one request
+OPENAI_BATCH_MAX_TOKENS = int(os.environ.get("OPENAI_BATCH_MAX_TOKENS", 4000))
+OPENAI_BATCH_MAX_ITEMS = int(os.environ.get("OPENAI_BATCH_MAX_ITEMS", 20))
+OPENAI_BATCH_MAX_PAIRS = int(os.environ.get("OPENAI_BATCH_MAX_PAIRS", 200))
+
+# Translation examples included in one translate_completion prompt
+OPENAI_MAX_TRANSLATION_EXAMPLES = int(os.environ.get("OPENAI_MAX_TRANSLATION_EXAMPLES", 5))
+# Upper bound (seconds) on how long a worker keeps a category's keyword index
+KEYWORD_INDEX_TTL = int(os.environ.get("KEYWORD_INDEX_TTL", 300))
+
+# Products translated concurrently by translate_product_parameters (OpenAI calls)
+OPENAI_TRANSLATION_WORKERS = int(os.environ.get("OPENAI_TRANSLATION_WORKERS", 4))
+
+# Product ids per getInventoryProductsData request
+BASELINKER_PRODUCTS_PAGE_SIZE = int(os.environ.get("BASELINKER_PRODUCTS_PAGE_SIZE", 100))
+
+# Upper bound (seconds) on how long a worker keeps its compiled custom/category tags
+TAG_ENGINE_TTL = int(os.environ.get("TAG_ENGINE_TTL", 300))
+
+# Allegro API: pooled session, timeouts (seconds), transport retries and concurrent offer downloads.
+# ALLEGRO_RATE_LIMIT_BACKOFF is used when a 429 response has no Retry-After header.
+ALLEGRO_POOL_SIZE = int(os.environ.get("ALLEGRO_POOL_SIZE", 16))
+ALLEGRO_CONNECT_TIMEOUT = float(os.environ.get("ALLEGRO_CONNECT_TIMEOUT", 5))
+ALLEGRO_READ_TIMEOUT = float(os.environ.get("ALLEGRO_READ_TIMEOUT", 10))
+ALLEGRO_MAX_RETRIES = int(os.environ.get("ALLEGRO_MAX_RETRIES", 3))
+ALLEGRO_DOWNLOAD_WORKERS = int(os.environ.get("ALLEGRO_DOWNLOAD_WORKERS", 8))
+ALLEGRO_RATE_LIMIT_BACKOFF = float(os.environ.get("ALLEGRO_RATE_LIMIT_BACKOFF", 5))
+
+# Catalogue export checkpoints: offers stored per write, and how long (seconds) stored details
+# without an Allegro modification time are reused by a resumed export
+ALLEGRO_CATALOGUE_FLUSH_SIZE = int(os.environ.get("ALLEGRO_CATALOGUE_FLUSH_SIZE", 100))
+ALLEGRO_CATALOGUE_CHECKPOINT_MAX_AGE = int(os.environ.get("ALLEGRO_CATALOGUE_CHECKPOINT_MAX_AGE", 24 * 60 * 60))
+
+# Seconds between full catalogue syncs; runs in between only apply Allegro's offer events
+ALLEGRO_CATALOGUE_FULL_SYNC_INTERVAL = int(os.environ.get("ALLEGRO_CATALOGUE_FULL_SYNC_INTERVAL", 7 * 24 * 60 * 60))
+
+# Seconds before expiry at which the cached Allegro access token is refreshed
+ALLEGRO_TOKEN_REFRESH_MARGIN = int(os.environ.get("ALLEGRO_TOKEN_REFRESH_MARGIN", 300))
+
+# Seconds Allegro category parameters are served without revalidating them
+ALLEGRO_CATEGORY_PARAMETERS_TTL = int(os.environ.get("ALLEGRO_CATEGORY_PARAMETERS_TTL", 24 * 60 * 60))
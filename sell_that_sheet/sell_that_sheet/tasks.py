@@ -2,6 +2,9 @@ from celery import shared_task
 from django.conf import settings
 from django.utils import timezone
 from .services.allegroconnector import AllegroConnector
+from .services.allegrocatalogue import export_catalogue
+from .services.baselinkerservice import BaseLinkerService
+from .models import AuctionSet
 from django.core.management import call_command
 import os
 import json
@@ -48,10 +51,8 @@ def export_allegro_catalogue_task(self):
     try:
         connector = AllegroConnector()
         connector.get_allegro_access_token()
-        catalogue = connector.download_catalogue()
-        parsed = connector.parse_catalogue(catalogue)
         output_path = os.path.join(settings.BASE_DIR, "full_catalogue.xlsx")
-        connector.export_to_xlsx(parsed, output_path)
+        export_catalogue(connector, output_path)
         update_task_status(
             "export_allegro_catalogue_task",
             self.request.id,
@@ -79,6 +80,42 @@ def export_auctions_task(self):
         raise
 
 
+@shared_task(bind=True)
+def upload_auctionset_task(self, auctionset_id: int):
+    auctionset = AuctionSet.objects.get(pk=auctionset_id)
+    progress = {
+        "auctionset_id": auctionset_id,
+        "total": auctionset.auctions.count(),
+        "auctions": {},
+    }
+
+    def on_progress(auction_id, stage, result):
+        entry = {"status": stage}
+        if result is not None:
+            entry.update({"product_id": result.product_id, "error": result.error})
+        progress["auctions"][str(auction_id)] = entry
+        self.update_state(state="PROGRESS", meta=progress)
+
+    self.update_state(state="PROGRESS", meta=progress)
+    results = BaseLinkerService().upload_products(auctionset, on_progress=on_progress)
+    return [result.model_dump() for result in results]
+
+
+def get_upload_progress(task_id: str):
+    """Return state and per-auction progress of an upload_auctionset_task."""
+    from celery.result import AsyncResult
+
+    result = AsyncResult(task_id)
+    response = {"task_id": task_id, "state": result.state}
+    if result.state == "PROGRESS":
+        response["progress"] = result.info
+    elif result.state == "SUCCESS":
+        response["results"] = result.result
+    elif result.state == "FAILURE":
+        response["error"] = str(result.result)
+    return response
+
+
 def get_tasks_status():
     """Return status information for all known tasks."""
     from celery.result import AsyncResult
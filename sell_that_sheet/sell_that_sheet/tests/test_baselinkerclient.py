@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import Counter, deque
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from ..management.commands.benchmark_baselinker_client import StubBaseLinkerHandler, start_stub_baselinker
+from ..services.baselinkerclient import BaseLinkerClient
+
+READ_TIMEOUT = 0.2
+RATE_LIMIT_CODE = "ERROR_LIMIT_EXCEEDED"
+
+
+class ScriptedHandler(StubBaseLinkerHandler):
+    """Plays the next scripted outcome for every call of a method, and succeeds once they run out."""
+    script = {}
+    calls = Counter()
+    lock = threading.Lock()
+
+    def respond(self, method):
+        with self.lock:
+            self.calls[method] += 1
+            outcomes = self.script.get(method)
+            outcome = outcomes.popleft() if outcomes else None
+
+        if outcome == "timeout":
+            time.sleep(READ_TIMEOUT * 3)
+        elif outcome == "rate_limit":
+            return 200, {"status": "ERROR", "error_code": RATE_LIMIT_CODE, "error_message": "Query limit exceeded"}
+        elif isinstance(outcome, int):
+            return outcome, {"status": "ERROR"}
+        return super().respond(method)
+
+
+@override_settings(
+    BASELINKER_MAX_RETRIES=2,
+    BASELINKER_RETRY_BACKOFF=0,
+    BASELINKER_READ_TIMEOUT=READ_TIMEOUT,
+    BASELINKER_RATE_LIMIT_ERROR_CODES=[RATE_LIMIT_CODE],
+)
+class BaseLinkerClientRetryTests(SimpleTestCase):
+    """Writes must only be resent when BaseLinker is known not to have acted on them."""
+    WRITE = "addInventoryProduct"
+    READ = "getInventories"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server, cls.url = start_stub_baselinker(handler=ScriptedHandler)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        ScriptedHandler.script = {}
+        ScriptedHandler.calls = Counter()
+        self.client = BaseLinkerClient(token="test", url=self.url)
+
+    def script(self, method, *outcomes):
+        ScriptedHandler.script[method] = deque(outcomes)
+
+    def test_write_not_resent_after_bad_gateway(self):
+        for status in (502, 504):
+            with self.subTest(status=status):
+                ScriptedHandler.calls.clear()
+                self.script(self.WRITE, status)
+                with self.assertRaises(requests.HTTPError):
+                    self.client.call(self.WRITE, {"sku": "test"})
+                self.assertEqual(ScriptedHandler.calls[self.WRITE], 1)
+
+    def test_write_not_resent_after_read_timeout(self):
+        self.script(self.WRITE, "timeout")
+        with self.assertRaises(requests.Timeout):
+            self.client.call(self.WRITE, {"sku": "test"})
+        self.assertEqual(ScriptedHandler.calls[self.WRITE], 1)
+
+    def test_read_resent_after_bad_gateway(self):
+        for status in (502, 504):
+            with self.subTest(status=status):
+                ScriptedHandler.calls.clear()
+                self.script(self.READ, status)
+                self.assertEqual(self.client.call(self.READ)["status"], "SUCCESS")
+                self.assertEqual(ScriptedHandler.calls[self.READ], 2)
+
+    def test_read_resent_after_read_timeout(self):
+        self.script(self.READ, "timeout")
+        self.assertEqual(self.client.call(self.READ)["status"], "SUCCESS")
+        self.assertEqual(ScriptedHandler.calls[self.READ], 2)
+
+    def test_rate_limit_resent_for_reads_and_writes(self):
+        for method in (self.READ, self.WRITE):
+            for outcome in ("rate_limit", 429):
+                with self.subTest(method=method, outcome=outcome):
+                    ScriptedHandler.calls.clear()
+                    self.script(method, outcome)
+                    self.assertEqual(self.client.call(method)["status"], "SUCCESS")
+                    self.assertEqual(ScriptedHandler.calls[method], 2)
+
+    def test_read_gives_up_after_max_retries(self):
+        self.script(self.READ, 502, 502, 502, 502)
+        with self.assertRaises(requests.HTTPError):
+            self.client.call(self.READ)
+        self.assertEqual(ScriptedHandler.calls[self.READ], 3)
@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from ..models import Auction, AuctionParameter, Parameter, PhotoSet
+from ..models.translations import AuctionParameterTranslation, ParameterTranslation
+from ..services.feature_translation_service import (
+    get_auction_parameter_translations_batch,
+    get_translations_batch,
+)
+from ..services.translation_snapshot import invalidate_translation_snapshot
+
+
+class BatchTranslationQueryCountTests(TestCase):
+    """The batch resolvers must not query per feature or per split value."""
+    PARAMETERS = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        photoset = PhotoSet.objects.create(directory_location="test")
+        auction = Auction.objects.create(name="Felga aluminiowa", price_pln=100, photoset=photoset)
+        cls.features = {}
+        cls.expected = {}
+        for i in range(cls.PARAMETERS):
+            parameter = Parameter.objects.create(allegro_id=str(1000 + i), name=f"Parametr {i}", type="string")
+            ParameterTranslation.objects.create(parameter=parameter, translation=f"Parameter {i}")
+            for value, translation in ((f"wartość {i}", f"Wert {i}"), (f"inna {i}", f"andere {i}")):
+                single = AuctionParameter.objects.create(
+                    parameter=parameter, auction=auction, value_name=value, value_id=""
+                )
+                AuctionParameterTranslation.objects.create(auction_parameter=single, translation=translation)
+            # Multi-value parameters are translated value by value
+            AuctionParameter.objects.create(
+                parameter=parameter, auction=auction, value_name=f"wartość {i}|inna {i}", value_id=""
+            )
+            cls.features[parameter.name] = f"wartość {i}|inna {i}"
+            cls.expected[parameter.name] = {
+                "parameter_translation": f"Parameter {i}",
+                "value_translation": f"Wert {i}|andere {i}",
+            }
+
+    def setUp(self):
+        invalidate_translation_snapshot()
+
+    def test_features_dict_resolved_with_two_queries(self):
+        with self.assertNumQueries(2):
+            translations = get_translations_batch(self.features)
+        self.assertEqual(translations, self.expected)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_translations_batch(self.features), self.expected)
+
+    def test_auction_parameters_resolved_with_two_queries(self):
+        auction_parameters = list(
+            AuctionParameter.objects.filter(value_name__contains="|").select_related("parameter").order_by("pk")
+        )
+        self.assertEqual(len(auction_parameters), self.PARAMETERS)
+
+        with self.assertNumQueries(2):
+            translations = get_auction_parameter_translations_batch(auction_parameters)
+        self.assertEqual(translations, [self.expected[ap.parameter.name] for ap in auction_parameters])
+
+        with self.assertNumQueries(0):
+            get_auction_parameter_translations_batch(auction_parameters)
+
+    def test_missing_value_translation_is_none(self):
+        name = next(iter(self.features))
+        translations = get_translations_batch({name: "nieznana|wartość 0"})
+        self.assertEqual(translations[name]["parameter_translation"], "Parameter 0")
+        self.assertIsNone(translations[name]["value_translation"])
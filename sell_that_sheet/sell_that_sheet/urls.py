@@ -22,6 +22,7 @@ from .views import (
     download_auctionset_xlsx,
     UserView,
     UploadAuctionSetToBaselinkerView,
+    UploadAuctionSetProgressView,
     PrepareTagFieldPreview,
     PerformOcrView,
     ListGroupUsersView,
@@ -188,6 +189,11 @@ urlpatterns = [
         UploadAuctionSetToBaselinkerView.as_view(),
         name="upload_auctionset_to_baselinker",
     ),
+    path(
+        "auctionsets/baselinker/upload/progress/<str:task_id>",
+        UploadAuctionSetProgressView.as_view(),
+        name="upload_auctionset_progress",
+    ),
     path("tag-preview/", PrepareTagFieldPreview.as_view(), name="tag_preview"),
     path("api/translate/", TranslateView.as_view(), name="translate"),
     path(
@@ -31,6 +31,7 @@ from .serializers.category_parameter import CategoryParameterSerializer
 from .serializers.inputtagpreview import InputTagField
 from .services import list_directory_contents, AllegroConnector, perform_ocr, put_files_in_completed_directory
 from .services.openaiservice import OpenAiService
+from .services.categoryparameters import get_category_parameters
 from .serializers import (
     AuctionSerializer,
     PhotoSetSerializer,
@@ -54,9 +55,11 @@ from django.shortcuts import redirect, render
 import requests
 
 from .services.baselinkerservice import BaseLinkerService
+from .services.baselinkerclient import BaseLinkerClient, BaseLinkerRateLimitError
+from .services.translation_snapshot import get_translation_snapshot, invalidate_translation_snapshot
 from .services.directorybrowser import put_files_from_auctionset_in_completed_directory, apply_rotation_to_image
 
-from .tasks import get_tasks_status
+from .tasks import get_tasks_status, get_upload_progress, upload_auctionset_task
 
 class AuctionViewSet(viewsets.ModelViewSet):
     queryset = Auction.objects.all()
@@ -273,27 +276,14 @@ class SaveTranslationsView(APIView):
             except Parameter.DoesNotExist:
                 continue
 
+        invalidate_translation_snapshot()
         return Response({"message": "Translations saved successfully."}, status=status.HTTP_200_OK)
 
 class ListTranslationsView(APIView):
     def get(self, request, *args, **kwargs):
-        param_translations = []
-        auction_param_translations = []
-
-        # 1) Parameter translations
-        for pt in ParameterTranslation.objects.all():
-            param_translations.append({
-                "param_id": pt.parameter.id,
-                "translation": pt.translation
-            })
-
-        # 2) AuctionParameter translations
-        for apt in AuctionParameterTranslation.objects.all():
-            auction_param_translations.append({
-                "param_id": apt.auction_parameter.parameter.id,
-                "value_name": apt.auction_parameter.value_name,
-                "translation": apt.translation
-            })
+        snapshot = get_translation_snapshot()
+        param_translations = snapshot.parameter_rows
+        auction_param_translations = snapshot.value_rows
 
         return Response({
             "param_translations": param_translations,
@@ -473,21 +463,13 @@ class AllegroCallbackView(APIView):
             {"message": "Token fetched successfully"}, status=status.HTTP_200_OK
         )
 
-def check_new_parameters(parameters):
-    for parameter in parameters:
-        try:
-            Parameter.objects.get(allegro_id=parameter["id"])
-        except Parameter.DoesNotExist:
-            Parameter.objects.create(allegro_id=parameter["id"], name=parameter["name"], type=parameter["type"])
-
 class AllegroGetCategoryParametersView(APIView):
     def get(self, request, categoryId):
-        connector = AllegroConnector()
-        url = f"https://api.allegro.pl/sale/categories/{categoryId}/parameters"
-        response = connector.make_authenticated_get_request(request, url)
-        # async check if response parameters are already in the database and if not, save them
-        check_new_parameters(response['parameters'])
-        return Response(response)
+        # Cached with Allegro's ETag; unknown parameters are saved whenever a new response is downloaded
+        response, etag = get_category_parameters(categoryId)
+        if etag and request.headers.get("If-None-Match") == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(response, headers={"ETag": etag} if etag else None)
 
 
 class AllegroMatchCategoryView(APIView):
@@ -508,7 +490,7 @@ class AllegroGetCategoryByIdView(APIView):
         return Response(response)
 
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.apps import apps
 
 
@@ -536,11 +518,26 @@ class GetModelStructure(APIView):
             return JsonResponse({"error": "Model not found"}, status=404)
 
 class UploadAuctionSetToBaselinkerView(APIView):
+    """
+    Uploads an auction set to BaseLinker.
+    With ?async=1 the upload is queued as a Celery task and its id is returned immediately,
+    progress can then be polled from UploadAuctionSetProgressView.
+    """
+
     def post(self, request, auctionset_id):
-        auctionset = AuctionSet.objects.get(pk=auctionset_id)
+        auctionset = get_object_or_404(AuctionSet, pk=auctionset_id)
+        if request.query_params.get("async") in ("1", "true"):
+            task = upload_auctionset_task.delay(auctionset.id)
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
         baselinker_service = BaseLinkerService()
-        response = baselinker_service.upload_products(auctionset)
-        return Response(response)
+        results = baselinker_service.upload_products(auctionset)
+        return Response([result.model_dump() for result in results])
+
+
+class UploadAuctionSetProgressView(APIView):
+    def get(self, request, task_id):
+        return Response(get_upload_progress(task_id), status=status.HTTP_200_OK)
 
 
 
@@ -1000,7 +997,8 @@ class TranslateBaselinkerProductsView(APIView):
             400: 'Bad Request',
             401: 'Unauthorized',
         },
-        operation_description="Translate Baselinker products using the specified language"
+        operation_description="Translate Baselinker products using the specified language. "
+                              "With ?stream=1 per-product results are streamed as newline-delimited JSON."
     )
 
     def post(self, request):
@@ -1012,6 +1010,14 @@ class TranslateBaselinkerProductsView(APIView):
 
         # Call the translation service
         blservice = BaseLinkerService()
+        if request.query_params.get("stream") in ("1", "true"):
+            # One JSON object per line, written as soon as each product is done
+            results = blservice.iter_translate_product_parameters(product_ids, language, inventory_id)
+            return StreamingHttpResponse(
+                (json.dumps(result) + "\n" for result in results),
+                content_type="application/x-ndjson",
+            )
+
         response = blservice.translate_product_parameters(product_ids, language, inventory_id)
 
         return Response(response)
@@ -1053,29 +1059,19 @@ class BaselinkerInventoriesView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        url = 'https://api.baselinker.com/connector.php'
-        headers = {
-            'X-BLToken': token,
-        }
-        payload = {
-            'method': 'getInventories',
-            'parameters': json.dumps({}),  # must be a JSON-encoded string
-        }
+        client = BaseLinkerClient(token=token)
 
         try:
-            resp = requests.post(url, headers=headers, data=payload, timeout=10)
-            resp.raise_for_status()
-        except requests.RequestException as e:
+            bl_data = client.call('getInventories')
+        # Also a RequestException, so it has to be caught first
+        except requests.JSONDecodeError as e:
             return Response(
-                {'error': 'Error communicating with Baselinker API', 'details': str(e)},
+                {'error': 'Invalid JSON from Baselinker', 'details': str(e)},
                 status=status.HTTP_502_BAD_GATEWAY
             )
-
-        try:
-            bl_data = resp.json()
-        except ValueError:
+        except (requests.RequestException, BaseLinkerRateLimitError) as e:
             return Response(
-                {'error': 'Invalid JSON from Baselinker', 'content': resp.text},
+                {'error': 'Error communicating with Baselinker API', 'details': str(e)},
                 status=status.HTTP_502_BAD_GATEWAY
             )
 